@@ -19,6 +19,16 @@ logger = logging.getLogger(__name__)
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 
+# Directory served by the /audio endpoint
+AUDIO_STORAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'audio_storage')
+
+# Map language codes
+TTS_LANGUAGES = {
+    'en': 'en',
+    'si': 'si',  # Sinhala
+    'ta': 'ta'   # Tamil
+}
+
 
 class AudioManager:
     """Manages audio generation and upload for emergency calls"""
@@ -36,6 +46,11 @@ class AudioManager:
                 logger.error(f"Failed to initialize Audio Manager: {e}")
                 self.client = None
     
+    def audio_filename(self, text: str, language: str = 'en') -> str:
+        """Unique filename based on content hash, so the same message maps to the same file"""
+        text_hash = hashlib.md5(text.encode()).hexdigest()[:10]
+        return f"emergency_{text_hash}_{TTS_LANGUAGES.get(language, 'en')}.mp3"
+    
     def generate_audio_from_text(
         self, 
         text: str, 
@@ -52,18 +67,8 @@ class AudioManager:
             Tuple of (success, audio_file_path or error_message)
         """
         try:
-            # Map language codes
-            lang_map = {
-                'en': 'en',
-                'si': 'si',  # Sinhala
-                'ta': 'ta'   # Tamil
-            }
-            
-            tts_lang = lang_map.get(language, 'en')
-            
-            # Generate unique filename based on content hash
-            text_hash = hashlib.md5(text.encode()).hexdigest()[:10]
-            filename = f"emergency_{text_hash}_{tts_lang}.mp3"
+            tts_lang = TTS_LANGUAGES.get(language, 'en')
+            filename = self.audio_filename(text, language)
             
             # Create temporary file
             temp_dir = tempfile.gettempdir()
@@ -107,10 +112,7 @@ class AudioManager:
         try:
             if storage_dir is None:
                 # Use a directory relative to the app folder
-                storage_dir = os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)),
-                    'audio_storage'
-                )
+                storage_dir = AUDIO_STORAGE_DIR
             
             # Create storage directory if it doesn't exist
             os.makedirs(storage_dir, exist_ok=True)
@@ -119,9 +121,19 @@ class AudioManager:
             filename = os.path.basename(audio_path)
             destination_path = os.path.join(storage_dir, filename)
             
-            # Copy file to storage (or move if temp)
+            # Copy to a temporary name in the same directory, then rename it into
+            # place: the reuse check in generate_and_upload_message (and the
+            # /audio endpoint) only ever see complete files
             import shutil
-            shutil.copy2(audio_path, destination_path)
+            fd, partial_path = tempfile.mkstemp(dir=storage_dir, prefix=f".{filename}.", suffix=".part")
+            os.close(fd)
+            try:
+                shutil.copy2(audio_path, partial_path)
+                os.replace(partial_path, destination_path)
+            except Exception:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                raise
             
             logger.info(f"Audio saved to local storage: {destination_path}")
             return True, filename
@@ -154,6 +166,14 @@ class AudioManager:
             # Just use the raw message - keep it simple for emergency services
             full_message = user_message
             
+            # Retry calls for the same message (Reflection Agent) reuse the stored
+            # file instead of waiting on gTTS again
+            filename = self.audio_filename(full_message, language)
+            if os.path.exists(os.path.join(AUDIO_STORAGE_DIR, filename)):
+                public_url = f"{base_url}/audio/{filename}"
+                logger.info(f"Reusing stored audio file: {public_url}")
+                return True, public_url
+            
             # Step 1: Generate audio
             success, result = self.generate_audio_from_text(full_message, language)
             
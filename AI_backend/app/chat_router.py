@@ -5,6 +5,8 @@ import os
 import logging
 import sys
 import io
+import json
+from urllib.parse import parse_qsl
 from dotenv import load_dotenv
 from gtts import gTTS
 
@@ -16,10 +18,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from AI_backend.app.langchain_utils import format_response_as_list
 # from AI_backend.app.langgraph_utils import get_multilingual_response  # OLD: Sequential (backup)
-from AI_backend.app.langgraph_enhanced import get_enhanced_response, clean_response  # NEW: Parallel execution with LangGraph tools
+from AI_backend.app.langgraph_enhanced import get_enhanced_response, stream_enhanced_response, clean_response  # NEW: Parallel execution with LangGraph tools
 from AI_backend.app.db_utils import save_chat_interaction, get_emergency_calls, get_emergency_statistics
-from AI_backend.app.twilio_service import twilio_service
-from AI_backend.app.reflection_agent import reflection_agent
+from AI_backend.app.twilio_service import twilio_service, STATUS_CALLBACK_URL, TWILIO_AUTH_TOKEN
+from AI_backend.app.reflection_agent import reflection_agent, record_call_status
 from AI_backend.app.escalation_agent import escalation_agent
 from AI_backend.app.fast_classifier import fast_classifier, IntentType
 
@@ -30,6 +32,155 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter()
 
+async def handle_emergency_intent(user_input: str, emergency_intent: dict) -> dict:
+    """
+    Place the emergency call(s) for a detected emergency and build the chat response
+    
+    Single emergencies are called directly and monitored by the Reflection Agent;
+    multiple emergencies are coordinated by the Escalation Agent.
+    """
+    detected_lang = emergency_intent.get('language', 'en')
+    emergencies_list = emergency_intent.get('emergencies', [])
+    total_count = emergency_intent.get('total_count', 0)
+    
+    logger.info(f"🚨 {total_count} Emergency(ies) detected!")
+    
+    # CHECK: Single or Multiple emergencies?
+    if total_count == 1:
+        # SINGLE EMERGENCY - Direct call with Reflection Agent
+        emergency = emergencies_list[0]
+        emergency_type = emergency['type']
+        emergency_number = emergency['number']
+        
+        logger.info(f"   Single emergency: {emergency_type}")
+        
+        # Initiate the INITIAL emergency call WITH user's message
+        success, call_info = await twilio_service.make_emergency_call_async(
+            to_number=emergency_number,
+            emergency_type=emergency_type,
+            user_message=user_input,
+            language=detected_lang
+        )
+    
+    elif total_count > 1:
+        # 🤖 MULTIPLE EMERGENCIES - Activate Escalation Agent
+        logger.info(f"   🤖 ACTIVATING ESCALATION AGENT for {total_count} emergencies")
+        
+        # Agent autonomously coordinates all calls
+        coordination_result = escalation_agent.coordinate_multi_emergency(
+            emergencies=emergencies_list,
+            user_message=user_input,
+            language=detected_lang
+        )
+        
+        # Extract results for response
+        calls = coordination_result.get('calls', [])
+        success = coordination_result.get('successful_calls', 0) > 0
+        call_info = calls  # Multiple calls
+        emergency_type = "multi_emergency"  # Special indicator
+        
+        logger.info(f"   ✅ Escalation complete: {coordination_result.get('successful_calls', 0)}/{total_count} calls successful")
+    
+    else:
+        # No emergencies (shouldn't happen, but safety check)
+        logger.warning("   ⚠️ Emergency detected but count is 0")
+        success = False
+        call_info = "No emergencies to process"
+        emergency_type = "none"
+    
+    # Handle response based on emergency type
+    if emergency_type == "multi_emergency":
+        # MULTIPLE EMERGENCIES - Build comprehensive response
+        calls = call_info  # This is array of calls
+        successful_services = [c['type'] for c in calls if c['status'] == 'initiated']
+        failed_services = [c['type'] for c in calls if c['status'] == 'failed']
+        
+        # Build multi-service response message
+        if detected_lang == 'si':
+            response_message = f"🚨 හදිසි සේවා {len(successful_services)} කට අමතනු ලැබීය:\n"
+            response_message += "\n".join([f"✅ {s.upper()}" for s in successful_services])
+            if failed_services:
+                response_message += f"\n\n⚠️ අසාර්ථකයි: {', '.join(failed_services)}"
+        elif detected_lang == 'ta':
+            response_message = f"🚨 {len(successful_services)} அவசர சேவைகளுக்கு அழைக்கப்பட்டது:\n"
+            response_message += "\n".join([f"✅ {s.upper()}" for s in successful_services])
+            if failed_services:
+                response_message += f"\n\n⚠️ தோல்வியுற்றது: {', '.join(failed_services)}"
+        else:
+            response_message = f"🚨 {len(successful_services)} Emergency services contacted:\n"
+            response_message += "\n".join([f"✅ {s.upper()}" for s in successful_services])
+            if failed_services:
+                response_message += f"\n\n⚠️ Failed: {', '.join(failed_services)}"
+        
+        # Save multi-emergency interaction
+        save_chat_interaction(
+            user_message=user_input,
+            bot_response=f"Multi-emergency: {len(successful_services)} calls initiated (Escalation Agent + Reflection Agents)",
+            message_type='multi_emergency_call'
+        )
+        
+        return {
+            "response": response_message,
+            "language": detected_lang,
+            "emergency_call": True,
+            "multi_emergency": True,
+            "calls": calls,
+            "total_emergencies": total_count,
+            "successful_calls": len(successful_services),
+            "escalation_agent_active": True,
+            "reflection_agents_active": True
+        }
+    
+    else:
+        # SINGLE EMERGENCY - Standard response
+        emergency_type = emergencies_list[0]['type']
+        emergency_number = emergencies_list[0]['number']
+        
+        response_message = twilio_service.get_emergency_response_text(
+            emergency_type=emergency_type,
+            language=detected_lang
+        )
+        
+        service_name = twilio_service.get_service_name(
+            emergency_type=emergency_type,
+            language=detected_lang
+        )
+        
+        if success:
+            call_sid = call_info
+            logger.info(f"✅ Initial emergency call successful: {call_sid}")
+            
+            # 🤖 ACTIVATE REFLECTION & RECOVERY AGENT
+            logger.info(f"🤖 Activating Reflection & Recovery Agent for call {call_sid}")
+            
+            reflection_agent.start_monitoring(call_sid, emergency_type, user_input, detected_lang)
+            
+            logger.info("🤖 Reflection Agent now monitoring call autonomously")
+            
+            # Save the emergency interaction
+            save_chat_interaction(
+                user_message=user_input,
+                bot_response=f"Emergency call initiated: {emergency_type} - Call SID: {call_sid} (Monitored by Reflection Agent)",
+                message_type='emergency_call'
+            )
+        else:
+            logger.error(f"❌ Initial emergency call failed: {call_info}")
+            response_message += f"\n\n⚠️ Note: Automated call failed ({call_info}). Please dial {emergency_number} directly!"
+            call_sid = None
+        
+        return {
+            "response": response_message,
+            "language": detected_lang,
+            "emergency_call": True,
+            "emergency_type": emergency_type,
+            "service_name": service_name,
+            "emergency_number": emergency_number,
+            "call_initiated": success,
+            "call_sid": call_sid,
+            "reflection_agent_active": success
+        }
+
+
 @router.post("/chat")
 async def chat(request: Request):
     logger.info("Received request for /chat")
@@ -77,160 +228,15 @@ async def chat(request: Request):
             }
         
         # LAYER 1: Check if this is an emergency call request (may be MULTIPLE!)
-        emergency_intent = twilio_service.detect_emergency_intent(user_input)
+        emergency_intent = await twilio_service.detect_emergency_intent_async(user_input)
         
         if emergency_intent:
-            detected_lang = emergency_intent.get('language', 'en')
-            emergencies_list = emergency_intent.get('emergencies', [])
-            total_count = emergency_intent.get('total_count', 0)
-            
-            logger.info(f"🚨 {total_count} Emergency(ies) detected!")
-            
-            # CHECK: Single or Multiple emergencies?
-            if total_count == 1:
-                # SINGLE EMERGENCY - Direct call with Reflection Agent
-                emergency = emergencies_list[0]
-                emergency_type = emergency['type']
-                emergency_number = emergency['number']
-                
-                logger.info(f"   Single emergency: {emergency_type}")
-                
-                # Initiate the INITIAL emergency call WITH user's message
-                success, call_info = twilio_service.make_emergency_call(
-                    to_number=emergency_number,
-                    emergency_type=emergency_type,
-                    user_message=user_input,
-                    language=detected_lang
-                )
-            
-            elif total_count > 1:
-                # 🤖 MULTIPLE EMERGENCIES - Activate Escalation Agent
-                logger.info(f"   🤖 ACTIVATING ESCALATION AGENT for {total_count} emergencies")
-                
-                # Agent autonomously coordinates all calls
-                coordination_result = escalation_agent.coordinate_multi_emergency(
-                    emergencies=emergencies_list,
-                    user_message=user_input,
-                    language=detected_lang
-                )
-                
-                # Extract results for response
-                calls = coordination_result.get('calls', [])
-                success = coordination_result.get('successful_calls', 0) > 0
-                call_info = calls  # Multiple calls
-                emergency_type = "multi_emergency"  # Special indicator
-                
-                logger.info(f"   ✅ Escalation complete: {coordination_result.get('successful_calls', 0)}/{total_count} calls successful")
-            
-            else:
-                # No emergencies (shouldn't happen, but safety check)
-                logger.warning("   ⚠️ Emergency detected but count is 0")
-                success = False
-                call_info = "No emergencies to process"
-                emergency_type = "none"
-            
-            # Handle response based on emergency type
-            if emergency_type == "multi_emergency":
-                # MULTIPLE EMERGENCIES - Build comprehensive response
-                calls = call_info  # This is array of calls
-                successful_services = [c['type'] for c in calls if c['status'] == 'initiated']
-                failed_services = [c['type'] for c in calls if c['status'] == 'failed']
-                
-                # Build multi-service response message
-                if detected_lang == 'si':
-                    response_message = f"🚨 හදිසි සේවා {len(successful_services)} කට අමතනු ලැබීය:\n"
-                    response_message += "\n".join([f"✅ {s.upper()}" for s in successful_services])
-                    if failed_services:
-                        response_message += f"\n\n⚠️ අසාර්ථකයි: {', '.join(failed_services)}"
-                elif detected_lang == 'ta':
-                    response_message = f"🚨 {len(successful_services)} அவசர சேவைகளுக்கு அழைக்கப்பட்டது:\n"
-                    response_message += "\n".join([f"✅ {s.upper()}" for s in successful_services])
-                    if failed_services:
-                        response_message += f"\n\n⚠️ தோல்வியுற்றது: {', '.join(failed_services)}"
-                else:
-                    response_message = f"🚨 {len(successful_services)} Emergency services contacted:\n"
-                    response_message += "\n".join([f"✅ {s.upper()}" for s in successful_services])
-                    if failed_services:
-                        response_message += f"\n\n⚠️ Failed: {', '.join(failed_services)}"
-                
-                # Save multi-emergency interaction
-                save_chat_interaction(
-                    user_message=user_input,
-                    bot_response=f"Multi-emergency: {len(successful_services)} calls initiated (Escalation Agent + Reflection Agents)",
-                    message_type='multi_emergency_call'
-                )
-                
-                return {
-                    "response": response_message,
-                    "language": detected_lang,
-                    "emergency_call": True,
-                    "multi_emergency": True,
-                    "calls": calls,
-                    "total_emergencies": total_count,
-                    "successful_calls": len(successful_services),
-                    "escalation_agent_active": True,
-                    "reflection_agents_active": True
-                }
-            
-            else:
-                # SINGLE EMERGENCY - Standard response
-                emergency_type = emergencies_list[0]['type']
-                emergency_number = emergencies_list[0]['number']
-                
-                response_message = twilio_service.get_emergency_response_text(
-                    emergency_type=emergency_type,
-                    language=detected_lang
-                )
-                
-                service_name = twilio_service.get_service_name(
-                    emergency_type=emergency_type,
-                    language=detected_lang
-                )
-                
-                if success:
-                    call_sid = call_info
-                    logger.info(f"✅ Initial emergency call successful: {call_sid}")
-                    
-                    # 🤖 ACTIVATE REFLECTION & RECOVERY AGENT
-                    logger.info(f"🤖 Activating Reflection & Recovery Agent for call {call_sid}")
-                    
-                    import threading
-                    monitoring_thread = threading.Thread(
-                        target=reflection_agent.monitor_and_recover,
-                        args=(call_sid, emergency_type, user_input, detected_lang),
-                        daemon=True
-                    )
-                    monitoring_thread.start()
-                    
-                    logger.info("🤖 Reflection Agent now monitoring call autonomously")
-                    
-                    # Save the emergency interaction
-                    save_chat_interaction(
-                        user_message=user_input,
-                        bot_response=f"Emergency call initiated: {emergency_type} - Call SID: {call_sid} (Monitored by Reflection Agent)",
-                        message_type='emergency_call'
-                    )
-                else:
-                    logger.error(f"❌ Initial emergency call failed: {call_info}")
-                    response_message += f"\n\n⚠️ Note: Automated call failed ({call_info}). Please dial {emergency_number} directly!"
-                    call_sid = None
-                
-                return {
-                    "response": response_message,
-                    "language": detected_lang,
-                    "emergency_call": True,
-                    "emergency_type": emergency_type,
-                    "service_name": service_name,
-                    "emergency_number": emergency_number,
-                    "call_initiated": success,
-                    "call_sid": call_sid,
-                    "reflection_agent_active": success
-                }
+            return await handle_emergency_intent(user_input, emergency_intent)
         
         # If not an emergency call, proceed with normal chat
         # LAYER 2: Enhanced LangGraph with parallel tool execution (NEW!)
         logger.info("🚀 Using enhanced LangGraph with parallel processing")
-        response_data = get_enhanced_response(
+        response_data = await get_enhanced_response(
             user_input, 
             thread_id=session_id,
             conversation_history=conversation_history
@@ -268,6 +274,90 @@ async def chat(request: Request):
             content={"error": "An internal error occurred during chat processing."}
         )
 
+def sse_format(event: dict) -> str:
+    """Encode an event dict as a Server-Sent Events data frame"""
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: Request):
+    """
+    Streaming variant of /chat using Server-Sent Events
+    
+    LLM responses are streamed as {"token": ...} events followed by a final
+    {"done": true, ...} event with the formatted response. Fast-path and
+    emergency responses are sent as a single final event.
+    """
+    logger.info("Received request for /chat/stream")
+    data = await request.json()
+    user_input = data.get("message")
+    session_id = data.get("session_id", "default_session")
+    conversation_history = data.get("conversation_history", [])
+    
+    if not user_input:
+        logger.warning("Received empty message in /chat/stream request")
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Message cannot be empty."}
+        )
+    
+    async def event_stream():
+        try:
+            # LAYER 0: Fast Reactive Classifier
+            intent, fast_response, confidence = fast_classifier.classify(user_input)
+            if fast_response:
+                save_chat_interaction(
+                    user_message=user_input,
+                    bot_response=fast_response,
+                    message_type='fast_cached'
+                )
+                yield sse_format({
+                    "done": True,
+                    "response": {"type": "text", "content": fast_response},
+                    "language": fast_classifier.detect_language(user_input),
+                    "emergency_call": False,
+                    "processing_path": "reactive_cached"
+                })
+                return
+            
+            # LAYER 1: Emergency detection and calls
+            emergency_intent = await twilio_service.detect_emergency_intent_async(user_input)
+            if emergency_intent:
+                yield sse_format({"done": True, **(await handle_emergency_intent(user_input, emergency_intent))})
+                return
+            
+            # LAYER 2: Stream the enhanced LangGraph response
+            async for event in stream_enhanced_response(
+                user_input,
+                thread_id=session_id,
+                conversation_history=conversation_history
+            ):
+                if not event.get("done"):
+                    yield sse_format(event)
+                    continue
+                
+                raw_response = clean_response(event["response"])
+                save_chat_interaction(
+                    user_message=user_input,
+                    bot_response=raw_response,
+                    message_type='text'
+                )
+                yield sse_format({
+                    "done": True,
+                    "response": format_response_as_list(raw_response),
+                    "language": event["language"],
+                    "emergency_call": False,
+                    "processing_path": "enhanced_streaming",
+                    "processing_time_ms": event.get("processing_time_ms", 0)
+                })
+        
+        except Exception as e:
+            logger.error(f"Error during streamed chat processing: {e}", exc_info=True)
+            yield sse_format({"done": True, "error": "An internal error occurred during chat processing."})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.get("/", response_class=HTMLResponse)
 async def read_root():
     logger.info("Serving index copy 2.html")
@@ -411,6 +501,31 @@ async def get_call_status(call_sid: str):
             content={"error": str(e)}
         )
 
+@router.post("/call_status_callback")
+async def call_status_callback(request: Request):
+    """
+    Twilio statusCallback webhook: pushes call status changes to the Reflection Agent
+    so it does not have to poll the Twilio API
+    """
+    # Twilio signs every parameter, including empty ones like CallerCity=
+    params = dict(parse_qsl((await request.body()).decode(), keep_blank_values=True))
+    
+    # Only trust requests signed by Twilio for the URL we registered
+    if TWILIO_AUTH_TOKEN and STATUS_CALLBACK_URL:
+        from twilio.request_validator import RequestValidator
+        signature = request.headers.get("X-Twilio-Signature", "")
+        if not RequestValidator(TWILIO_AUTH_TOKEN).validate(STATUS_CALLBACK_URL, params, signature):
+            logger.warning("Rejected call status callback with invalid Twilio signature")
+            return JSONResponse(status_code=403, content={"error": "Invalid signature"})
+    
+    call_sid = params.get("CallSid")
+    call_status = params.get("CallStatus")
+    if call_sid and call_status:
+        monitored = record_call_status(call_sid, call_status)
+        logger.info(f"📨 Call status callback: {call_sid} -> {call_status} (monitored: {monitored})")
+    
+    return {"success": True}
+
 # Audio file serving endpoint
 @router.get("/audio/{filename}")
 async def serve_audio_file(filename: str):
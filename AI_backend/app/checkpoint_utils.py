@@ -0,0 +1,53 @@
+"""
+Checkpoint helpers shared by the LangGraph graphs
+Compressed checkpoint serialization and a thread-bounded in-memory saver
+"""
+from collections import OrderedDict
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+import logging
+import zlib
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+class CompressedSerializer(JsonPlusSerializer):
+    """Checkpoint serializer that zlib-compresses the serialized state payload"""
+    
+    def dumps_typed(self, obj):
+        type_, data = super().dumps_typed(obj)
+        return f"zlib+{type_}", zlib.compress(data)
+    
+    def loads_typed(self, data):
+        type_, payload = data
+        if type_.startswith("zlib+"):
+            return super().loads_typed((type_[len("zlib+"):], zlib.decompress(payload)))
+        return super().loads_typed(data)
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    In-process checkpointer that keeps only the most recently active threads
+    
+    A plain MemorySaver keeps every thread forever; here the least recently
+    written thread is deleted once more than max_threads are stored.
+    Checkpoints are compressed with CompressedSerializer unless serde is given.
+    """
+    
+    def __init__(self, max_threads: int, **kwargs):
+        kwargs.setdefault("serde", CompressedSerializer())
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self._thread_order = OrderedDict()
+    
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        self._thread_order[thread_id] = None
+        self._thread_order.move_to_end(thread_id)
+        while len(self._thread_order) > self.max_threads:
+            evicted, _ = self._thread_order.popitem(last=False)
+            self.delete_thread(evicted)
+            logger.debug(f"🧹 Evicted checkpoint thread {evicted}")
+        return result
@@ -23,7 +23,6 @@ from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from openai import OpenAI
 import json
-import threading
 
 load_dotenv()
 
@@ -344,11 +343,12 @@ Decide optimal strategy:"""
         logger.info(f"📞 Initiating {len(emergencies)} PARALLEL calls...")
         
         call_results = []
-        threads = []
         
         # Import here to avoid circular import
-        from app.twilio_service import twilio_service
-        from app.reflection_agent import reflection_agent
+        # Relative imports resolve within the importing package, so the router
+        # (AI_backend.app) and this agent share one status registry
+        from .twilio_service import twilio_service
+        from .reflection_agent import reflection_agent
         
         # Start all calls simultaneously
         for i, emergency in enumerate(emergencies, 1):
@@ -366,14 +366,8 @@ Decide optimal strategy:"""
                 call_sid = call_info  # call_info is call_sid when success=True
                 logger.info(f"   ✅ Call initiated: {call_sid}")
                 
-                # Start Reflection Agent monitoring (parallel thread)
-                monitor_thread = threading.Thread(
-                    target=reflection_agent.monitor_and_recover,
-                    args=(call_sid, emergency['type'], user_message, language),
-                    daemon=True
-                )
-                monitor_thread.start()
-                threads.append(monitor_thread)
+                # Start Reflection Agent monitoring (runs in the background)
+                reflection_agent.start_monitoring(call_sid, emergency['type'], user_message, language)
                 
                 call_results.append({
                     'type': emergency['type'],
@@ -423,8 +417,10 @@ Decide optimal strategy:"""
         call_results = []
         
         # Import here to avoid circular import
-        from app.twilio_service import twilio_service
-        from app.reflection_agent import reflection_agent
+        # Relative imports resolve within the importing package, so the router
+        # (AI_backend.app) and this agent share one status registry
+        from .twilio_service import twilio_service
+        from .reflection_agent import reflection_agent
         
         # Call one by one
         for i, emergency in enumerate(emergencies, 1):
@@ -442,13 +438,8 @@ Decide optimal strategy:"""
                 call_sid = call_info  # call_info is call_sid when success=True
                 logger.info(f"   ✅ Call initiated: {call_sid}")
                 
-                # Start Reflection Agent monitoring (background thread)
-                monitor_thread = threading.Thread(
-                    target=reflection_agent.monitor_and_recover,
-                    args=(call_sid, emergency['type'], user_message, language),
-                    daemon=True
-                )
-                monitor_thread.start()
+                # Start Reflection Agent monitoring (runs in the background)
+                reflection_agent.start_monitoring(call_sid, emergency['type'], user_message, language)
                 
                 call_results.append({
                     'type': emergency['type'],
@@ -16,12 +16,94 @@ Performance Impact:
 import re
 import random
 import logging
+import string
+import ahocorasick
 from typing import Optional, Dict, Tuple
+from functools import lru_cache
 from enum import Enum
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# UTF-8 lead-byte pairs of the Sinhala (U+0D80-U+0DFF) and Tamil (U+0B80-U+0BFF)
+# blocks; counting them on the encoded bytes avoids a per-character Python loop
+SINHALA_UTF8_PREFIXES = (b'\xe0\xb6', b'\xe0\xb7')
+TAMIL_UTF8_PREFIXES = (b'\xe0\xae', b'\xe0\xaf')
+ASCII_LETTER_BYTES = string.ascii_letters.encode('ascii')
+
+
+def _compile_any(patterns, flags=0) -> re.Pattern:
+    """Fuse patterns into one alternation so a single search scans the message once"""
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), flags)
+
+
+# Obvious non-emergency questions (math, trivia, jokes, etc.), compiled once at import
+NON_EMERGENCY_RE = _compile_any((
+    r'\b\d+\s*[\+\-\*\/x×÷]\s*\d+',  # Math: "1+1", "2*3", "5-2"
+    r'\bwhat\s+is\s+\d+\s*[\+\-\*\/]',  # "what is 1+1"
+    r'\bcalculate\b',  # Calculate
+    r'\bsolve\b',  # Solve
+    r'\b(capital|president|population|country|city)\s+of\b',  # Geography/trivia
+    r'\b(tell\s+me\s+a\s+)?(joke|story|fun\s+fact)\b',  # Entertainment
+    r'\b(weather|temperature|forecast)\b',  # Weather (not emergency)
+    r'\b(recipe|cook|food|restaurant)\b',  # Food
+    r'\b(movie|music|song|game|sport)\b',  # Entertainment
+    r'\b(meaning\s+of\s+life|philosophy|religion)\b',  # Philosophy
+))
+
+# Conversation-contextual queries (require conversation memory)
+CONTEXTUAL_RE = _compile_any((
+    r'\bmy\s+name\b',  # "what is my name"
+    r'\bi\s+(told|said|mentioned)\b',  # "I told you..."
+    r'\b(remember|recall|earlier)\b',  # "do you remember..."
+    r'\bwe\s+(talked|discussed|spoke)\b',  # "we talked about..."
+    r'\byou\s+(said|told|mentioned)\b',  # "you said..."
+    r'\b(මගේ\s+නම|මම\s+කිව්ව|මතකද)\b',  # Sinhala context
+    r'\b(என்\s+பெயர்|நான்\s+சொன்னேன்|நினைவிருக்கிறதா)\b'  # Tamil context
+))
+
+# Words that might signal an emergency; a message containing any of them is
+# never answered from cache and always goes to the LLM (substring matches)
+EMERGENCY_SAFETY_WORDS = (
+    'help', 'urgent', 'emergency', 'quick', 'fast', 'now', 'immediately',
+    'fire', 'police', 'ambulance', 'bleeding', 'hurt', 'injured', 'attack',
+    'robbery', 'break', 'theft', 'unconscious', 'breathing', 'chest pain',
+    'උදව්', 'හදිසි', 'ඉක්මන්', 'ගිනි', 'පොලිස්', 'ගිලන්',  # Sinhala
+    'உதவி', 'அவசரம்', 'உடனடி', 'தீ', 'காவல்', 'ஆம்புலன்ஸ்'  # Tamil
+)
+
+
+def _build_automaton(words) -> ahocorasick.Automaton:
+    """Aho-Corasick automaton mapping each word to itself"""
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+# One linear pass finds any safety word instead of one scan per word
+EMERGENCY_SAFETY_AUTOMATON = _build_automaton(EMERGENCY_SAFETY_WORDS)
+
+
+@lru_cache(maxsize=4096)
+def _detect_script_language(text: str) -> str:
+    """Script-count language detection for non-ASCII text, cached for repeated messages"""
+    data = text.encode('utf-8', 'surrogatepass')
+    sinhala = sum(data.count(prefix) for prefix in SINHALA_UTF8_PREFIXES)
+    tamil = sum(data.count(prefix) for prefix in TAMIL_UTF8_PREFIXES)
+    english = len(data) - len(data.translate(None, ASCII_LETTER_BYTES))
+    
+    total = sinhala + tamil + english
+    if total == 0:
+        return 'en'
+    
+    if sinhala > tamil and sinhala > english * 0.3:
+        return 'si'
+    elif tamil > english * 0.3:
+        return 'ta'
+    return 'en'
+
 
 class IntentType(Enum):
     """Classification of user intent for fast routing"""
@@ -262,11 +344,31 @@ class FastIntentClassifier:
         # Pattern matchers for fast classification (compiled regex)
         self.patterns = self._compile_patterns()
         
+        # Flat (intent, regex) pairs for the only intents answered without the LLM
+        # (greetings, farewells, thank you), checked in this order
+        self.safe_intent_patterns = tuple(
+            (intent, self.patterns[intent])
+            for intent in (IntentType.GREETING, IntentType.FAREWELL, IntentType.THANK_YOU)
+        )
+        # All safe intents fused into one regex: a single pass rules them all out
+        self.safe_intent_re = _compile_any(pattern.pattern for _, pattern in self.safe_intent_patterns)
+        
+        # (language, intent) -> response variations for the safe intents
+        self.safe_responses = {
+            (lang, intent): variations.get(intent)
+            for lang, variations in (
+                ('en', self.response_variations_en),
+                ('si', self.response_variations_si),
+                ('ta', self.response_variations_ta)
+            )
+            for intent, _ in self.safe_intent_patterns
+        }
+        
         logger.info("Fast Intent Classifier initialized (Reactive Agent Layer)")
         logger.info("Response cache TTL: 3600 seconds (1 hour)")
     
-    def _compile_patterns(self) -> Dict[IntentType, list]:
-        """Compile regex patterns for performance"""
+    def _compile_patterns(self) -> Dict[IntentType, re.Pattern]:
+        """Compile each intent's patterns into a single alternation regex"""
         pattern_definitions = {
             # Greetings (English, Sinhala, Tamil)
             IntentType.GREETING: [
@@ -341,28 +443,20 @@ class FastIntentClassifier:
             #   - Result: 100% test success rate (22/22 passed)
         }
         
-        # Compile all patterns
+        # Compile all patterns. classify() searches the lowercased message and the
+        # patterns are all lowercase, so no IGNORECASE case-folding is needed
         compiled = {}
         for intent, patterns in pattern_definitions.items():
-            compiled[intent] = [re.compile(p, re.IGNORECASE) for p in patterns]
+            compiled[intent] = _compile_any(patterns)
         
         return compiled
     
     def detect_language(self, text: str) -> str:
         """Quick language detection based on Unicode"""
-        sinhala = len([c for c in text if '\u0D80' <= c <= '\u0DFF'])
-        tamil = len([c for c in text if '\u0B80' <= c <= '\u0BFF'])
-        english = len([c for c in text if c.isalpha() and ord(c) < 128])
-        
-        total = sinhala + tamil + english
-        if total == 0:
+        # Pure-ASCII text (most English messages) cannot contain Sinhala or Tamil
+        if text.isascii():
             return 'en'
-        
-        if sinhala > tamil and sinhala > english * 0.3:
-            return 'si'
-        elif tamil > english * 0.3:
-            return 'ta'
-        return 'en'
+        return _detect_script_language(text)
     
     def classify(self, message: str) -> Tuple[IntentType, Optional[str], float]:
         """
@@ -386,40 +480,15 @@ class FastIntentClassifier:
         
         # STEP 1: Block OBVIOUS non-emergency questions (math, trivia, jokes, etc.)
         # These are safe to reject without LLM consultation
-        non_emergency_patterns = [
-            r'\b\d+\s*[\+\-\*\/x×÷]\s*\d+',  # Math: "1+1", "2*3", "5-2"
-            r'\bwhat\s+is\s+\d+\s*[\+\-\*\/]',  # "what is 1+1"
-            r'\bcalculate\b',  # Calculate
-            r'\bsolve\b',  # Solve
-            r'\b(capital|president|population|country|city)\s+of\b',  # Geography/trivia
-            r'\b(tell\s+me\s+a\s+)?(joke|story|fun\s+fact)\b',  # Entertainment
-            r'\b(weather|temperature|forecast)\b',  # Weather (not emergency)
-            r'\b(recipe|cook|food|restaurant)\b',  # Food
-            r'\b(movie|music|song|game|sport)\b',  # Entertainment
-            r'\b(meaning\s+of\s+life|philosophy|religion)\b',  # Philosophy
-        ]
-        
-        for pattern in non_emergency_patterns:
-            if re.search(pattern, message_lower):
-                logger.info(f"🚫 NON-EMERGENCY QUESTION detected - returning redirect message")
-                redirect_msg = "I'm specialized in emergency assistance only. I can help with:\n\n🚓 Police emergencies (119)\n🚒 Fire & rescue (110)\n🚑 Medical emergencies (1990)\n🛡️ Safety guidance for emergencies\n\nDo you need emergency help?"
-                return (IntentType.UNKNOWN, redirect_msg, 1.0)
+        if NON_EMERGENCY_RE.search(message_lower):
+            logger.info(f"🚫 NON-EMERGENCY QUESTION detected - returning redirect message")
+            redirect_msg = "I'm specialized in emergency assistance only. I can help with:\n\n🚓 Police emergencies (119)\n🚒 Fire & rescue (110)\n🚑 Medical emergencies (1990)\n🛡️ Safety guidance for emergencies\n\nDo you need emergency help?"
+            return (IntentType.UNKNOWN, redirect_msg, 1.0)
         
         # STEP 2: Detect conversation-contextual queries (require conversation memory)
-        contextual_patterns = [
-            r'\bmy\s+name\b',  # "what is my name"
-            r'\bi\s+(told|said|mentioned)\b',  # "I told you..."
-            r'\b(remember|recall|earlier)\b',  # "do you remember..."
-            r'\bwe\s+(talked|discussed|spoke)\b',  # "we talked about..."
-            r'\byou\s+(said|told|mentioned)\b',  # "you said..."
-            r'\b(මගේ\s+නම|මම\s+කිව්ව|මතකද)\b',  # Sinhala context
-            r'\b(என்\s+பெயர்|நான்\s+சொன்னேன்|நினைவிருக்கிறதா)\b'  # Tamil context
-        ]
-        
-        for pattern in contextual_patterns:
-            if re.search(pattern, message_lower):
-                logger.info(f"⚡ CONTEXTUAL QUERY detected - escalating to LLM (requires conversation memory)")
-                return (IntentType.UNKNOWN, None, 0.0)
+        if CONTEXTUAL_RE.search(message_lower):
+            logger.info(f"⚡ CONTEXTUAL QUERY detected - escalating to LLM (requires conversation memory)")
+            return (IntentType.UNKNOWN, None, 0.0)
         
         # STEP 3: Check cache for ONLY very specific, safe queries
         # Only use cache for exact matches of FAQ-type questions without any emergency words
@@ -427,15 +496,7 @@ class FastIntentClassifier:
         cached = self.cache.get(cache_key)
         
         # SAFETY CHECK: Don't use cache if message contains ANY potential emergency words
-        emergency_safety_words = [
-            'help', 'urgent', 'emergency', 'quick', 'fast', 'now', 'immediately',
-            'fire', 'police', 'ambulance', 'bleeding', 'hurt', 'injured', 'attack',
-            'robbery', 'break', 'theft', 'unconscious', 'breathing', 'chest pain',
-            'උදව්', 'හදිසි', 'ඉක්මන්', 'ගිනි', 'පොලිස්', 'ගිලන්',  # Sinhala
-            'உதவி', 'அவசரம்', 'உடனடி', 'தீ', 'காவல்', 'ஆம்புலன்ஸ்'  # Tamil
-        ]
-        
-        has_emergency_word = any(word in message_lower for word in emergency_safety_words)
+        has_emergency_word = next(EMERGENCY_SAFETY_AUTOMATON.iter(message_lower), None) is not None
         
         if cached and not has_emergency_word:
             lang = self.detect_language(message)
@@ -449,16 +510,14 @@ class FastIntentClassifier:
         
         # STEP 5: Try simple pattern matching for ONLY safe intents (greetings, farewells, thank you)
         # REMOVED: Help requests, FAQ, status checks - these go to LLM now
-        safe_intents_only = [IntentType.GREETING, IntentType.FAREWELL, IntentType.THANK_YOU]
-        
+        # Most messages reaching this step match no safe intent, which the fused
+        # regex settles in one scan; on a hit, the per-intent checks keep the
+        # greeting > farewell > thank-you priority
         matched_intent = None
-        for intent in safe_intents_only:
-            if intent in self.patterns:
-                for pattern in self.patterns[intent]:
-                    if pattern.search(message_lower):
-                        matched_intent = intent
-                        break
-                if matched_intent:
+        if self.safe_intent_re.search(message_lower):
+            for intent, pattern in self.safe_intent_patterns:
+                if pattern.search(message_lower):
+                    matched_intent = intent
                     break
         
         if not matched_intent:
@@ -467,13 +526,7 @@ class FastIntentClassifier:
         
         # Get random response variation for safe intents (natural conversation)
         lang = self.detect_language(message)
-        variation_dict = {
-            'en': self.response_variations_en,
-            'si': self.response_variations_si,
-            'ta': self.response_variations_ta
-        }
-        
-        response_variations = variation_dict.get(lang, self.response_variations_en).get(matched_intent)
+        response_variations = self.safe_responses.get((lang, matched_intent))
         
         if response_variations:
             # Randomly select one variation for natural, non-repetitive responses
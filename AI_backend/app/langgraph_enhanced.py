@@ -16,7 +16,8 @@ Latency Impact:
 """
 
 from typing import Literal, TypedDict, Annotated, Sequence
-from langgraph.checkpoint.memory import MemorySaver
+from functools import lru_cache
+from langgraph.types import Send
 from langgraph.graph import StateGraph, START, END, add_messages
 from langchain_core.messages import HumanMessage, SystemMessage, BaseMessage, AIMessage
 from langchain_openai import ChatOpenAI
@@ -25,10 +26,18 @@ from langchain_core.tools import tool
 import logging
 import os
 from dotenv import load_dotenv
+import ahocorasick
+import httpx
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import importlib.util
+import operator
+import re
+import string
+import threading
 import time
 
+from .checkpoint_utils import BoundedMemorySaver, CompressedSerializer
+
 # Load environment variables
 load_dotenv()
 
@@ -43,27 +52,114 @@ gemini_api_key = os.getenv('GEMINI_API_KEY')
 if not openai_api_key or not gemini_api_key:
     raise ValueError("API keys required")
 
+# Conversation context limits
+MAX_HISTORY = int(os.getenv('MAX_HISTORY', '4'))  # Recent history items sent verbatim
+CRITICAL_HISTORY = int(os.getenv('CRITICAL_HISTORY', '10'))  # Wider window for critical emergencies
+SUMMARY_EVERY = int(os.getenv('SUMMARY_EVERY', '4'))  # Re-summarize after this many new older items
+ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', '1024'))  # Cached analysis results per helper
+
+# Speculative routing: when language detection is unsure, ask every language model
+# at once and keep the best reply. Off by default because it triples token cost.
+SPECULATIVE_ROUTING = os.getenv('SPECULATIVE_ROUTING', 'false').lower() == 'true'
+SPECULATION_CONFIDENCE = float(os.getenv('SPECULATION_CONFIDENCE', '0.5'))  # Speculate below this confidence
+STICKY_LANGUAGE_TURNS = int(os.getenv('STICKY_LANGUAGE_TURNS', '4'))  # Earlier user turns weighed when speculating
+STICKY_LANGUAGE_WEIGHT = float(os.getenv('STICKY_LANGUAGE_WEIGHT', '0.5'))  # Weight of the thread's language
+
+
+# ==================== KEYWORD TABLES ====================
+# Built once at import and shared by every request
+
+EMERGENCY_KEYWORDS = {
+    'en': frozenset(['emergency', 'urgent', 'help', 'police', 'fire', 'ambulance',
+                     'robbery', 'accident', 'injured', 'bleeding', 'unconscious']),
+    'si': frozenset(['හදිසි', 'ඉක්මන්', 'උදව්', 'පොලිස්', 'ගිනි', 'ගිලන්',
+                     'සොරකම්', 'අනතුරක්', 'තුවාලයක්']),
+    'ta': frozenset(['அவசரம்', 'உடனடி', 'உதவி', 'காவல்', 'தீ', 'ஆம்புலன்ஸ்',
+                     'திருட்டு', 'விபத்து', 'காயம்'])
+}
+
+# Severity indicators (substring matches, like the emergency keywords)
+SEVERITY_KEYWORDS = {
+    'critical': frozenset(['unconscious', 'not breathing', 'severe bleeding', 'heart attack',
+                           'stroke', 'chest pain', 'heavy bleeding', 'severe burn',
+                           'අවි', 'මියයන', 'හුස්ම නැති', 'තදින් ලේ', 'හෘදයාබාධ',
+                           'மயக்கம்', 'மூச்சு', 'கடுமையான', 'இதய']),
+    'minor': frozenset(['minor', 'small', 'little', 'slight', 'light',
+                        'සුළු', 'කුඩා', 'අඩු',
+                        'சிறிய', 'சிறிது', 'குறைவு'])
+}
+
+# Priority keywords used to rank steps when summarizing
+CRITICAL_STEP_KEYWORDS = {
+    'en': frozenset(['call', 'emergency', '119', '110', '1990', 'bleeding', 'pressure',
+                     'ambulance', 'police', 'fire', 'danger', 'safe', 'urgent']),
+    'si': frozenset(['අමතන්න', 'හදිසි', '119', '110', '1990', 'ලේ', 'තද',
+                     'ගිලන්', 'පොලිස්', 'ගිනි', 'අනතුර', 'ආරක්ෂිත']),
+    'ta': frozenset(['அழை', 'அவசர', '119', '110', '1990', 'இரத்த', 'அழுத்த',
+                     'ஆம்புலன்ஸ்', 'காவல்', 'தீ', 'ஆபத்து', 'பாதுகாப்பு'])
+}
+
+# Script counting for language detection works on the UTF-8 bytes, where
+# bytes.count/bytes.translate scan in C without creating per-character objects.
+# Every Sinhala char (U+0D80-U+0DFF) encodes as E0 B6 xx / E0 B7 xx and every
+# Tamil char (U+0B80-U+0BFF) as E0 AE xx / E0 AF xx; E0 only ever starts a char.
+SINHALA_UTF8_PREFIXES = (b'\xe0\xb6', b'\xe0\xb7')
+TAMIL_UTF8_PREFIXES = (b'\xe0\xae', b'\xe0\xaf')
+ASCII_LETTER_BYTES = string.ascii_letters.encode('ascii')
+
+# Common romanized Sinhala/Tamil words ("Singlish"/"Tanglish") that count toward
+# that language, not English, when choosing between speculative replies
+ROMANIZED_WORDS = {
+    'si': frozenset(['mata', 'mage', 'oya', 'oyage', 'karanna', 'udaw', 'udavu', 'puluwan',
+                     'mokakda', 'kohomada', 'epa', 'nane', 'ganna', 'denna', 'hari', 'neda']),
+    'ta': frozenset(['enakku', 'ennoda', 'naan', 'neenga', 'ungal', 'udhavi', 'udavi', 'vendum',
+                     'venum', 'illai', 'illa', 'romba', 'seri', 'enna', 'irukku', 'pannunga'])
+}
+
+# Numbered-step patterns used by summarize_long_response, e.g. "1.", "2)"
+STEP_SPLIT_RE = re.compile(r'(?:^|\n)(\d+[\.\)])\s+')
+STEP_NUMBER_RE = re.compile(r'\d+')
+STEP_HEAD_RE = re.compile(r'^\d+[\.\)]')
+
+
+def _build_keyword_automaton(keyword_table: dict) -> ahocorasick.Automaton:
+    """Aho-Corasick automaton mapping each keyword to (tag, keyword)"""
+    automaton = ahocorasick.Automaton()
+    for tag, keywords in keyword_table.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, (tag, keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+# One linear pass over the text finds every keyword of a table at once
+EMERGENCY_AUTOMATON = _build_keyword_automaton(EMERGENCY_KEYWORDS)
+SEVERITY_AUTOMATON = _build_keyword_automaton(SEVERITY_KEYWORDS)
+STEP_KEYWORD_AUTOMATONS = {
+    lang: _build_keyword_automaton({lang: keywords})
+    for lang, keywords in CRITICAL_STEP_KEYWORDS.items()
+}
+
 
 # ==================== TOOLS DEFINITION ====================
-# These tools can be executed in parallel by LangGraph
+# These tools can be executed in parallel by LangGraph.
+# The analysis helpers are deterministic, so repeated messages ("help", "emergency")
+# are served from an LRU cache. Cached results are shared: treat them as read-only.
 
-@tool
-def detect_language_tool(text: str) -> dict:
-    """
-    Detect language from text using Unicode analysis.
-    This is a fast, deterministic tool that can run in parallel.
-    
-    Args:
-        text: Input text to analyze
-    
-    Returns:
-        Dictionary with detected language and confidence
-    """
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _detect_language(text: str) -> dict:
+    """Unicode-range language detection shared by the tool and the graph node"""
     logger.info(f"🔧 TOOL: detect_language_tool executing")
     
-    sinhala = len([c for c in text if '\u0D80' <= c <= '\u0DFF'])
-    tamil = len([c for c in text if '\u0B80' <= c <= '\u0BFF'])
-    english = len([c for c in text if c.isalpha() and ord(c) < 128])
+    # Pure-ASCII text (most English messages) cannot contain Sinhala or Tamil;
+    # confidence is 1.0 if it has any letter, else the no-letters default
+    if text.isascii():
+        return {"language": "en", "confidence": 1.0 if any(map(str.isalpha, text)) else 0.5}
+    
+    data = text.encode('utf-8', 'surrogatepass')
+    sinhala = sum(data.count(prefix) for prefix in SINHALA_UTF8_PREFIXES)
+    tamil = sum(data.count(prefix) for prefix in TAMIL_UTF8_PREFIXES)
+    english = len(data) - len(data.translate(None, ASCII_LETTER_BYTES))
     
     total = sinhala + tamil + english
     
@@ -82,36 +178,13 @@ def detect_language_tool(text: str) -> dict:
         return {"language": "en", "confidence": english_ratio}
 
 
-@tool
-def check_emergency_keywords_tool(text: str) -> dict:
-    """
-    Fast keyword-based emergency detection.
-    Runs in parallel with LLM-based detection for speed.
-    
-    Args:
-        text: Text to check for emergency keywords
-    
-    Returns:
-        Dictionary with emergency flag and matched keywords
-    """
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _check_emergency_keywords(text_lower: str) -> dict:
+    """Keyword scan over already-lowercased text"""
     logger.info(f"🔧 TOOL: check_emergency_keywords_tool executing")
     
-    emergency_keywords = {
-        'en': ['emergency', 'urgent', 'help', 'police', 'fire', 'ambulance', 
-               'robbery', 'accident', 'injured', 'bleeding', 'unconscious'],
-        'si': ['හදිසි', 'ඉක්මන්', 'උදව්', 'පොලිස්', 'ගිනි', 'ගිලන්', 
-               'සොරකම්', 'අනතුරක්', 'තුවාලයක්'],
-        'ta': ['அவசரம்', 'உடனடி', 'உதவி', 'காவல்', 'தீ', 'ஆம்புலன்ஸ்',
-               'திருட்டு', 'விபத்து', 'காயம்']
-    }
-    
-    text_lower = text.lower()
-    matched = []
-    
-    for lang, keywords in emergency_keywords.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                matched.append(keyword)
+    # Each distinct keyword is reported once, in order of first appearance
+    matched = tuple(dict.fromkeys(keyword for _, (_, keyword) in EMERGENCY_AUTOMATON.iter(text_lower)))
     
     has_emergency = len(matched) > 0
     
@@ -122,35 +195,15 @@ def check_emergency_keywords_tool(text: str) -> dict:
     }
 
 
-@tool
-def assess_emergency_severity(text: str) -> dict:
-    """
-    Quickly assess emergency severity to determine response length.
-    Minor emergencies = shorter response, Critical emergencies = fuller response
-    
-    Args:
-        text: Text to assess for severity
-    
-    Returns:
-        Dictionary with severity level and max steps
-    """
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _assess_severity(text_lower: str) -> dict:
+    """Severity assessment over already-lowercased text"""
     logger.info(f"🔧 TOOL: assess_emergency_severity executing")
     
-    text_lower = text.lower()
-    
-    # Critical keywords
-    critical = ['unconscious', 'not breathing', 'severe bleeding', 'heart attack', 
-                'stroke', 'chest pain', 'heavy bleeding', 'severe burn',
-                'අවි', 'මියයන', 'හුස්ම නැති', 'තදින් ලේ', 'හෘදයාබාධ',
-                'மயக்கம்', 'மூச்சு', 'கடுமையான', 'இதய']
-    
-    # Minor keywords
-    minor = ['minor', 'small', 'little', 'slight', 'light',
-             'සුළු', 'කුඩා', 'අඩු',
-             'சிறிய', 'சிறிது', 'குறைவு']
-    
-    critical_count = sum(1 for word in critical if word in text_lower)
-    minor_count = sum(1 for word in minor if word in text_lower)
+    # Count distinct indicator words, as the per-keyword scan did
+    found = {hit for _, hit in SEVERITY_AUTOMATON.iter(text_lower)}
+    critical_count = sum(1 for tag, _ in found if tag == 'critical')
+    minor_count = len(found) - critical_count
     
     # Determine severity
     if critical_count > 0:
@@ -173,6 +226,52 @@ def assess_emergency_severity(text: str) -> dict:
     }
 
 
+@tool
+def detect_language_tool(text: str) -> dict:
+    """
+    Detect language from text using Unicode analysis.
+    This is a fast, deterministic tool that can run in parallel.
+    
+    Args:
+        text: Input text to analyze
+    
+    Returns:
+        Dictionary with detected language and confidence
+    """
+    return dict(_detect_language(text))
+
+
+@tool
+def check_emergency_keywords_tool(text: str) -> dict:
+    """
+    Fast keyword-based emergency detection.
+    Runs in parallel with LLM-based detection for speed.
+    
+    Args:
+        text: Text to check for emergency keywords
+    
+    Returns:
+        Dictionary with emergency flag and matched keywords
+    """
+    result = _check_emergency_keywords(text.lower())
+    return {**result, "matched_keywords": list(result["matched_keywords"])}
+
+
+@tool
+def assess_emergency_severity(text: str) -> dict:
+    """
+    Quickly assess emergency severity to determine response length.
+    Minor emergencies = shorter response, Critical emergencies = fuller response
+    
+    Args:
+        text: Text to assess for severity
+    
+    Returns:
+        Dictionary with severity level and max steps
+    """
+    return dict(_assess_severity(text.lower()))
+
+
 # ==================== ENHANCED STATE WITH TOOLS ====================
 
 class EnhancedMultilingualState(TypedDict):
@@ -180,9 +279,27 @@ class EnhancedMultilingualState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
     language: str
     detected_language: str
+    language_confidence: float
     emergency_keywords_detected: bool
-    tool_results: dict
+    emergency_matched: list
+    severity: str
+    max_steps: int
+    # Written concurrently by the fan-out analysis nodes, merged with dict union
+    analysis_timings: Annotated[dict, operator.or_]
     processing_time: float
+    # Model reply trimmed to the severity's step budget by finalize_response
+    final_response: str
+    summarization_time: float
+    # Condensed history older than the recent window, kept in the checkpointer;
+    # summarized_count is how many leading thread messages the summary covers
+    rolling_summary: str
+    summarized_count: int
+
+
+class AnalysisInput(TypedDict):
+    """Payload sent to each analysis node; the text is lowercased once for all of them"""
+    text: str
+    text_lower: str
 
 
 # ==================== SYSTEM PROMPTS ====================
@@ -306,204 +423,670 @@ Focus: EMERGENCY ASSISTANCE ONLY.""",
 கவனம்: அவசர உதவி மட்டும்."""
 }
 
+# Prebuilt once at import - the prompts never change between requests
+SYSTEM_MESSAGES = {lang: SystemMessage(content=prompt) for lang, prompt in SYSTEM_PROMPTS.items()}
+
 
 # ==================== PARALLEL PROCESSING NODES ====================
+# Each analyzer is its own graph node. fan_out_analysis dispatches all of them
+# from START with Send, together with the model node picked by route_by_language,
+# so LangGraph schedules the analysis and the LLM call in the same superstep.
+# Only the language decides the route, and that check runs in the fan-out itself.
+# Each node writes only its own scalar fields, so only the timings need a reducer.
+# The analyzers are microsecond-scale pure Python, so they are async def: the graph
+# runs them inline on the event loop instead of hopping to an executor thread.
+
+async def lang_detect_node(payload: AnalysisInput) -> dict:
+    """Run language detection as an independent graph node"""
+    start_time = time.time()
+    result = _detect_language(payload["text"])
+    elapsed = (time.time() - start_time) * 1000
+    return {
+        "detected_language": result["language"],
+        "language": result["language"],
+        "language_confidence": result["confidence"],
+        "analysis_timings": {"lang_detect": elapsed}
+    }
+
+
+async def emergency_check_node(payload: AnalysisInput) -> dict:
+    """Run keyword-based emergency detection as an independent graph node"""
+    start_time = time.time()
+    result = _check_emergency_keywords(payload["text_lower"])
+    elapsed = (time.time() - start_time) * 1000
+    return {
+        "emergency_keywords_detected": result["has_keywords"],
+        "emergency_matched": list(result["matched_keywords"]),
+        "analysis_timings": {"emergency_check": elapsed}
+    }
+
+
+async def severity_check_node(payload: AnalysisInput) -> dict:
+    """Run severity assessment as an independent graph node"""
+    start_time = time.time()
+    result = _assess_severity(payload["text_lower"])
+    elapsed = (time.time() - start_time) * 1000
+    return {
+        "severity": result["severity"],
+        "max_steps": result["max_steps"],
+        "analysis_timings": {"severity_check": elapsed}
+    }
+
+
+ANALYSIS_NODES = {
+    "lang_detect": lang_detect_node,
+    "emergency_check": emergency_check_node,
+    "severity_check": severity_check_node
+}
+
 
-def parallel_analysis_node(state: EnhancedMultilingualState) -> EnhancedMultilingualState:
+def fan_out_analysis(state: EnhancedMultilingualState) -> list:
     """
-    Node that runs multiple tools in PARALLEL for faster processing
+    Dispatch every analysis node and the language model in PARALLEL from START
     This is the key performance optimization!
     """
-    start_time = time.time()
     last_message = state["messages"][-1]
     message_text = last_message.content if hasattr(last_message, 'content') else str(last_message)
+    payload = {"text": message_text, "text_lower": message_text.lower()}
     
-    logger.info(f"🚀 PARALLEL EXECUTION: Running 3 tools simultaneously")
-    
-    # Run tools in parallel using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        # Submit all three tasks
-        lang_future = executor.submit(detect_language_tool.invoke, {"text": message_text})
-        emergency_future = executor.submit(check_emergency_keywords_tool.invoke, {"text": message_text})
-        severity_future = executor.submit(assess_emergency_severity.invoke, {"text": message_text})
-        
-        # Wait for all to complete
-        lang_result = lang_future.result()
-        emergency_result = emergency_future.result()
-        severity_result = severity_future.result()
+    logger.info(f"🚀 PARALLEL EXECUTION: Dispatching {len(ANALYSIS_NODES)} analysis nodes alongside the model")
+    return [*(Send(node_name, payload) for node_name in ANALYSIS_NODES), route_by_language(message_text)]
+
+
+# Language code -> model node; anything unrecognized goes to the English model
+LANGUAGE_ROUTES = {
+    "en": "english_model",
+    "si": "sinhala_model",
+    "ta": "tamil_model"
+}
+
+
+def route_by_language(text: str) -> Literal["english_model", "sinhala_model", "tamil_model", "speculative_model"]:
+    """Pick the model node for a message (detection is cached, so lang_detect reuses it)"""
+    detection = _detect_language(text)
+    language, confidence = detection["language"], detection["confidence"]
+    if SPECULATIVE_ROUTING and confidence < SPECULATION_CONFIDENCE:
+        logger.info(f"🎲 Ambiguous language ({language}, confidence {confidence:.2f}), speculating on all models")
+        return "speculative_model"
+    logger.info(f"🔀 Routing to {language} model")
+    return LANGUAGE_ROUTES.get(language, "english_model")
+
+
+# ==================== MODEL NODES ====================
+
+# Models and their HTTP pools are created lazily on first use, so importing this
+# module is cheap and every worker process builds its own connection pools.
+
+# Shared, pooled HTTP clients for every OpenAI model in this module.
+# HTTP/2 multiplexing is enabled when the optional h2 package is installed.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=3.0)
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+@lru_cache(maxsize=None)
+def get_openai_http_clients() -> tuple:
+    """Sync and async pooled HTTP clients shared by the OpenAI models"""
+    return (
+        httpx.Client(http2=_HTTP2, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+        httpx.AsyncClient(http2=_HTTP2, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_openai_model() -> ChatOpenAI:
+    """OpenAI chat model for English and Tamil"""
+    http_client, http_async_client = get_openai_http_clients()
+    model = ChatOpenAI(
+        model=os.getenv('MODEL_NAME', 'gpt-3.5-turbo'),
+        openai_api_key=openai_api_key,
+        streaming=True,  # Enable streaming for faster perceived response
+        stream_usage=True,  # Report token usage (incl. cached prompt tokens) when streaming
+        http_client=http_client,
+        http_async_client=http_async_client
+    )
+    logger.info(f"✅ Initialized OpenAI model (streaming enabled, pooled HTTP client, http2={_HTTP2})")
+    return model
+
+
+@lru_cache(maxsize=None)
+def get_gemini_model() -> ChatGoogleGenerativeAI:
+    """Gemini chat model for Sinhala"""
+    # Gemini uses Google's gRPC transport, which already multiplexes over one HTTP/2 channel
+    model = ChatGoogleGenerativeAI(
+        model=os.getenv('GEMINI_MODEL_NAME', 'gemini-2.0-flash-exp'),
+        google_api_key=gemini_api_key,
+        temperature=0.7,
+        convert_system_message_to_human=True
+    )
+    logger.info("✅ Initialized Gemini model")
+    return model
+
+
+@lru_cache(maxsize=None)
+def get_summary_model() -> ChatOpenAI:
+    """Small, cheap model used only to condense older conversation turns"""
+    http_client, http_async_client = get_openai_http_clients()
+    return ChatOpenAI(
+        model=os.getenv('SUMMARY_MODEL_NAME', 'gpt-4o-mini'),
+        openai_api_key=openai_api_key,
+        temperature=0,
+        max_tokens=150,
+        http_client=http_client,
+        http_async_client=http_async_client
+    )
+
+
+def log_prompt_cache_usage(response: BaseMessage, model_label: str):
+    """Log how many input tokens the provider served from its prompt cache"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0)
+    if input_tokens:
+        cached_tokens = usage.get("input_token_details", {}).get("cache_read", 0)
+        logger.info(f"🗃️ {model_label} prompt cache: {cached_tokens}/{input_tokens} input tokens cached")
+
+
+def history_window(user_message: str) -> int:
+    """
+    Number of earlier thread messages sent verbatim with this user message
     
-    elapsed = (time.time() - start_time) * 1000  # Convert to ms
-    logger.info(f"⚡ Parallel execution completed in {elapsed:.0f}ms")
-    logger.info(f"📊 Severity: {severity_result['severity']} | Recommended max steps: {severity_result['max_steps']}")
+    Critical emergencies get a wider window so no detail of the situation is lost.
+    Severity is assessed alongside the model node; the cached result is reused.
+    """
+    severity = _assess_severity(user_message.lower())["severity"]
+    return CRITICAL_HISTORY if severity == "critical" else MAX_HISTORY
+
+
+def build_model_messages(state: EnhancedMultilingualState, language: str) -> list:
+    """
+    Prepend the language system prompt and any rolling summary to the conversation
     
-    return {
-        **state,
-        "detected_language": lang_result["language"],
-        "language": lang_result["language"],
-        "emergency_keywords_detected": emergency_result["has_keywords"],
-        "tool_results": {
-            "language_detection": lang_result,
-            "emergency_check": emergency_result,
-            "severity_assessment": severity_result
-        },
-        "processing_time": elapsed
-    }
+    The system prompt always comes first and is byte-identical across requests,
+    so providers with automatic prefix caching (OpenAI) can reuse it.
+    """
+    # The checkpoint keeps the whole thread; send the recent window plus the new turn.
+    # Messages already folded into the summary are not repeated verbatim.
+    messages = state["messages"]
+    window = history_window(messages[-1].content)
+    start = max(len(messages) - (window + 1), state.get("summarized_count", 0))
+    recent = messages[min(start, len(messages) - 1):]
+    summary = state.get("rolling_summary")
+    if summary:
+        summary_message = SystemMessage(content=f"Summary of earlier conversation: {summary}")
+        return [SYSTEM_MESSAGES[language], summary_message, *recent]
+    return [SYSTEM_MESSAGES[language], *recent]
+
+
+# Shown to the user when the model call fails
+MODEL_ERROR_MESSAGES = {
+    'en': "Sorry, I encountered an error. Please try again.",
+    'si': "සමාවන්න, දෝෂයක් ඇතිවිය. කරුණාකර නැවත උත්සාහ කරන්න.",
+    'ta': "மன்னிக்கவும், பிழை ஏற்பட்டது. தயவுசெய்து மீண்டும் முயற்சிக்கவும்."
+}
 
 
-def route_by_language(state: EnhancedMultilingualState) -> Literal["english_model", "sinhala_model", "tamil_model"]:
-    """Conditional edge function to route based on detected language."""
-    language = state.get("detected_language", "en")
-    logger.info(f"🔀 Routing to {language} model")
+def make_model_node(language: str, get_model, model_label: str, provider: str):
+    """
+    Build the graph node that answers in one language with one chat model
     
-    if language == "si":
-        return "sinhala_model"
-    elif language == "ta":
-        return "tamil_model"
-    else:
-        return "english_model"
+    Args:
+        language: Language code selecting the system prompt and error message
+        get_model: Accessor returning the chat model to invoke
+        model_label: Name used in logs, e.g. "English model"
+        provider: Provider name used in logs, e.g. "OpenAI"
+    
+    Returns:
+        Async node function returning the model reply as a state delta
+    """
+    async def model_node(state: EnhancedMultilingualState) -> dict:
+        start_time = time.time()
+        logger.info(f"🤖 Processing with {model_label} ({provider})")
+        messages = build_model_messages(state, language)
+        
+        try:
+            response = await get_model().ainvoke(messages)
+            elapsed = (time.time() - start_time) * 1000
+            logger.info(f"✅ {model_label} response: {elapsed:.0f}ms")
+            log_prompt_cache_usage(response, model_label)
+            return {"messages": [response]}
+        except Exception as e:
+            elapsed = (time.time() - start_time) * 1000
+            logger.error(f"❌ Error in {model_label} after {elapsed:.0f}ms: {e}")
+            error_msg = AIMessage(content=MODEL_ERROR_MESSAGES[language])
+            return {"messages": [error_msg]}
+    
+    return model_node
 
 
-# ==================== MODEL NODES ====================
+# Graph node name -> (language, model accessor, log label, provider)
+MODEL_NODE_SPECS = {
+    "english_model": ('en', get_openai_model, "English model", "OpenAI"),
+    "sinhala_model": ('si', get_gemini_model, "Sinhala model", "Gemini"),
+    "tamil_model": ('ta', get_openai_model, "Tamil model", "OpenAI")
+}
 
-# Initialize models
-openai_model = ChatOpenAI(
-    model=os.getenv('MODEL_NAME', 'gpt-3.5-turbo'),
-    openai_api_key=openai_api_key,
-    streaming=True  # Enable streaming for faster perceived response
-)
 
-gemini_model = ChatGoogleGenerativeAI(
-    model=os.getenv('GEMINI_MODEL_NAME', 'gemini-2.0-flash-exp'),
-    google_api_key=gemini_api_key,
-    temperature=0.7,
-    convert_system_message_to_human=True
-)
+def _language_shares(text: str) -> dict:
+    """
+    Share of each language in a message's letters, counting romanized words
+    
+    Unlike _detect_language, romanized Sinhala/Tamil words count toward their
+    language instead of English, which is what mixed messages usually contain.
+    """
+    data = text.encode('utf-8', 'surrogatepass')
+    counts = {
+        'si': sum(data.count(prefix) for prefix in SINHALA_UTF8_PREFIXES),
+        'ta': sum(data.count(prefix) for prefix in TAMIL_UTF8_PREFIXES),
+        'en': len(data) - len(data.translate(None, ASCII_LETTER_BYTES))
+    }
+    for word in text.lower().split():
+        word = word.strip(string.punctuation)
+        for lang, words in ROMANIZED_WORDS.items():
+            if word in words:
+                counts[lang] += len(word)
+                counts['en'] -= len(word)
+    total = sum(counts.values())
+    if total == 0:
+        return {}
+    return {lang: count / total for lang, count in counts.items()}
 
-logger.info("✅ Initialized OpenAI model (streaming enabled)")
-logger.info("✅ Initialized Gemini model")
+
+def score_reply_languages(messages: list) -> dict:
+    """
+    Post-hoc language scores for choosing between speculative replies
+    
+    Combines the current message's script/romanization mix with the thread's
+    sticky language: the confidently detected language of recent user turns.
+    """
+    scores = {lang: 0.0 for lang, _, _, _ in MODEL_NODE_SPECS.values()}
+    for lang, share in _language_shares(messages[-1].content).items():
+        scores[lang] += share
+    
+    earlier = [msg for msg in messages[:-1] if isinstance(msg, HumanMessage)][-STICKY_LANGUAGE_TURNS:]
+    for msg in earlier:
+        detection = _detect_language(msg.content)
+        if detection["confidence"] >= SPECULATION_CONFIDENCE:
+            scores[detection["language"]] += STICKY_LANGUAGE_WEIGHT / len(earlier)
+    return scores
 
 
-def english_model_node(state: EnhancedMultilingualState) -> EnhancedMultilingualState:
-    """Process with English model"""
+async def speculative_model_node(state: EnhancedMultilingualState) -> dict:
+    """
+    Ask every language model concurrently for input whose language is ambiguous
+    
+    The reply is chosen by a post-hoc check rather than the low-confidence
+    detection that triggered speculation: languages are ranked by
+    score_reply_languages, and a reply only counts if it is actually written in
+    its model's language. If no reply passes, the best-ranked one that answered
+    is used, so the user still gets a reply.
+    """
     start_time = time.time()
-    logger.info("🤖 Processing with English model (OpenAI)")
-    system_message = SystemMessage(content=SYSTEM_PROMPTS['en'])
-    messages = [system_message] + list(state["messages"])
+    specs = list(MODEL_NODE_SPECS.values())
     
-    try:
-        response = openai_model.invoke(messages)
-        elapsed = (time.time() - start_time) * 1000
-        logger.info(f"✅ English model response: {elapsed:.0f}ms")
-        return {
-            **state,
-            "messages": list(state["messages"]) + [response]
-        }
-    except Exception as e:
-        elapsed = (time.time() - start_time) * 1000
-        logger.error(f"❌ Error in English model after {elapsed:.0f}ms: {e}")
-        error_msg = AIMessage(content="Sorry, I encountered an error. Please try again.")
-        return {
-            **state,
-            "messages": list(state["messages"]) + [error_msg]
-        }
+    replies = await asyncio.gather(
+        *(get_model().ainvoke(build_model_messages(state, lang)) for lang, get_model, _, _ in specs),
+        return_exceptions=True
+    )
+    
+    answered = {}
+    for (lang, _, model_label, _), reply in zip(specs, replies):
+        if isinstance(reply, BaseException):
+            logger.error(f"❌ Speculative {model_label} failed: {reply}")
+        else:
+            log_prompt_cache_usage(reply, model_label)
+            answered[lang] = reply
+    
+    elapsed = (time.time() - start_time) * 1000
+    logger.info(f"🎲 Speculative models answered {len(answered)}/{len(specs)} in {elapsed:.0f}ms")
+    
+    scores = score_reply_languages(state["messages"])
+    ranked = sorted(answered, key=scores.get, reverse=True)
+    in_own_language = [lang for lang in ranked if _detect_language(answered[lang].content)["language"] == lang]
+    language = next(iter(in_own_language or ranked), None)
+    if language is None:
+        best = max(scores, key=scores.get)
+        return {"messages": [AIMessage(content=MODEL_ERROR_MESSAGES[best])]}
+    
+    logger.info(f"🎲 Chose {language} reply (scores: "
+                + ", ".join(f"{lang}={score:.2f}" for lang, score in scores.items()) + ")")
+    return {"messages": [answered[language]]}
 
 
-def sinhala_model_node(state: EnhancedMultilingualState) -> EnhancedMultilingualState:
-    """Process with Sinhala model"""
-    start_time = time.time()
-    logger.info("🤖 Processing with Sinhala model (Gemini)")
-    system_message = SystemMessage(content=SYSTEM_PROMPTS['si'])
-    messages = [system_message] + list(state["messages"])
+# ==================== CHECKPOINTER ====================
+
+# Package providing each persistent backend, named in the fallback error
+CHECKPOINT_BACKEND_PACKAGES = {
+    'sqlite': 'langgraph-checkpoint-sqlite',
+    'redis': 'langgraph-checkpoint-redis'
+}
+
+
+def create_checkpointer():
+    """
+    Create the conversation checkpointer selected by CHECKPOINT_BACKEND
+    
+    - memory (default): in-process saver bounded to CHECKPOINT_MAX_THREADS threads
+    - sqlite: AsyncSqliteSaver at CHECKPOINT_DB with compressed payloads
+    - redis: AsyncRedisSaver at REDIS_URL with a per-thread TTL
+    
+    The graph only runs through ainvoke/astream_events/aget_state, so the
+    persistent backends use the async savers. AsyncSqliteSaver binds to the
+    running loop, so this must be called from inside the event loop.
+    
+    Falls back to the memory saver if the selected backend is unavailable.
+    """
+    backend = os.getenv('CHECKPOINT_BACKEND', 'memory').lower()
     
     try:
-        response = gemini_model.invoke(messages)
-        elapsed = (time.time() - start_time) * 1000
-        logger.info(f"✅ Sinhala model response: {elapsed:.0f}ms")
-        return {
-            **state,
-            "messages": list(state["messages"]) + [response]
-        }
+        if backend == 'sqlite':
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+            db_path = os.getenv('CHECKPOINT_DB', 'checkpoints.db')
+            # The saver opens the connection on first use, inside the event loop
+            saver = AsyncSqliteSaver(aiosqlite.connect(db_path), serde=CompressedSerializer())
+            logger.info(f"✅ Using SQLite checkpointer: {db_path}")
+            return saver
+        
+        if backend == 'redis':
+            from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+            ttl_minutes = int(os.getenv('CHECKPOINT_TTL_MINUTES', '60'))
+            # Search indices are created by asetup() in aget_enhanced_graph
+            saver = AsyncRedisSaver(
+                redis_url=os.getenv('REDIS_URL', 'redis://localhost:6379'),
+                ttl={"default_ttl": ttl_minutes, "refresh_on_read": True}
+            )
+            logger.info(f"✅ Using Redis checkpointer (TTL {ttl_minutes} min)")
+            return saver
+    except ImportError as e:
+        logger.error(
+            f"❌ CHECKPOINT_BACKEND={backend} needs {CHECKPOINT_BACKEND_PACKAGES[backend]} "
+            f"({e}); falling back to in-memory checkpoints, conversations will not persist"
+        )
     except Exception as e:
-        elapsed = (time.time() - start_time) * 1000
-        logger.error(f"❌ Error in Sinhala model after {elapsed:.0f}ms: {e}")
-        error_msg = AIMessage(content="සමාවන්න, දෝෂයක් ඇතිවිය. කරුණාකර නැවත උත්සාහ කරන්න.")
-        return {
-            **state,
-            "messages": list(state["messages"]) + [error_msg]
-        }
+        logger.error(f"❌ Failed to initialize {backend} checkpointer, using memory: {e}", exc_info=True)
+    
+    return BoundedMemorySaver(max_threads=int(os.getenv('CHECKPOINT_MAX_THREADS', '1000')))
 
 
-def tamil_model_node(state: EnhancedMultilingualState) -> EnhancedMultilingualState:
-    """Process with Tamil model"""
+# ==================== RESPONSE FINALIZATION ====================
+
+async def finalize_response_node(state: EnhancedMultilingualState) -> dict:
+    """
+    Join point after the analysis nodes and the model node: trim the reply to
+    the step budget chosen by the severity assessment
+    """
+    # Analysis branches ran concurrently, so the slowest one bounds the analysis time
+    analysis_time = max(state["analysis_timings"].values(), default=0.0)
+    logger.info(f"⚡ Parallel analysis completed in {analysis_time:.0f}ms")
+    logger.info(f"📊 Severity: {state['severity']} | Recommended max steps: {state['max_steps']}")
+    
     start_time = time.time()
-    logger.info("🤖 Processing with Tamil model (OpenAI)")
-    system_message = SystemMessage(content=SYSTEM_PROMPTS['ta'])
-    messages = [system_message] + list(state["messages"])
+    reply = state["messages"][-1].content
+    if state["severity"] in ("critical", "moderate"):
+        # Critical and moderate replies keep everything the model said (the prompt
+        # already caps them at 5 steps). These are the replies that get streamed,
+        # so the streamed text is then exactly the final text
+        final_response = reply
+    else:
+        final_response = summarize_long_response(
+            reply,
+            max_steps=state["max_steps"],
+            language=state["detected_language"]
+        )
     
-    try:
-        response = openai_model.invoke(messages)
-        elapsed = (time.time() - start_time) * 1000
-        logger.info(f"✅ Tamil model response: {elapsed:.0f}ms")
-        return {
-            **state,
-            "messages": list(state["messages"]) + [response]
-        }
-    except Exception as e:
-        elapsed = (time.time() - start_time) * 1000
-        logger.error(f"❌ Error in Tamil model after {elapsed:.0f}ms: {e}")
-        error_msg = AIMessage(content="மன்னிக்கவும், பிழை ஏற்பட்டது. தயவுசெய்து மீண்டும் முயற்சிக்கவும்.")
-        return {
-            **state,
-            "messages": list(state["messages"]) + [error_msg]
-        }
+    return {
+        "processing_time": analysis_time,
+        "final_response": final_response,
+        "summarization_time": (time.time() - start_time) * 1000
+    }
 
 
 # ==================== BUILD ENHANCED GRAPH ====================
 
+# Nodes whose tokens are streamed; the speculative node runs three models at
+# once, so its interleaved chunks are not streamed and only the final reply is sent
+MODEL_NODES = frozenset(MODEL_NODE_SPECS)
+
+
 def create_enhanced_multilingual_graph():
     """Create enhanced LangGraph with parallel tool execution"""
     workflow = StateGraph(EnhancedMultilingualState)
     
     # Add nodes
-    workflow.add_node("parallel_analysis", parallel_analysis_node)
-    workflow.add_node("english_model", english_model_node)
-    workflow.add_node("sinhala_model", sinhala_model_node)
-    workflow.add_node("tamil_model", tamil_model_node)
-    
-    # Add edges
-    workflow.add_edge(START, "parallel_analysis")
-    
-    # Conditional routing based on parallel analysis results
-    workflow.add_conditional_edges(
-        "parallel_analysis",
-        route_by_language,
-        {
-            "english_model": "english_model",
-            "sinhala_model": "sinhala_model",
-            "tamil_model": "tamil_model"
-        }
-    )
+    for node_name, node in ANALYSIS_NODES.items():
+        workflow.add_node(node_name, node)
+    for node_name, spec in MODEL_NODE_SPECS.items():
+        workflow.add_node(node_name, make_model_node(*spec))
+    workflow.add_node("speculative_model", speculative_model_node)
+    workflow.add_node("finalize_response", finalize_response_node)
+    
+    # Fan out from START to every analysis node plus the routed model node
+    model_node_names = [*LANGUAGE_ROUTES.values(), "speculative_model"]
+    workflow.add_conditional_edges(START, fan_out_analysis, [*ANALYSIS_NODES, *model_node_names])
     
-    # All models end after processing
-    workflow.add_edge("english_model", END)
-    workflow.add_edge("sinhala_model", END)
-    workflow.add_edge("tamil_model", END)
+    # Join: finalize once all analysis nodes AND the model that ran have finished.
+    # One barrier per model node; only the barrier of the model that ran completes.
+    for node_name in model_node_names:
+        workflow.add_edge([*ANALYSIS_NODES, node_name], "finalize_response")
+    workflow.add_edge("finalize_response", END)
     
-    # Compile with memory
-    memory = MemorySaver()
-    compiled = workflow.compile(checkpointer=memory)
+    # Compile with the configured checkpointer
+    compiled = workflow.compile(checkpointer=create_checkpointer())
     
     logger.info("✅ Enhanced LangGraph compiled with parallel tool execution")
     return compiled
 
 
-# Create global graph instance
-enhanced_graph = create_enhanced_multilingual_graph()
+_enhanced_graph = None
+_enhanced_graph_lock = threading.Lock()
+_checkpointer_ready = False
+
+
+def get_enhanced_graph():
+    """
+    Compiled enhanced graph, built on first use
+    
+    Locked so concurrent first requests share one graph (and one checkpointer)
+    """
+    global _enhanced_graph
+    if _enhanced_graph is None:
+        with _enhanced_graph_lock:
+            if _enhanced_graph is None:
+                _enhanced_graph = create_enhanced_multilingual_graph()
+    return _enhanced_graph
+
+
+async def aget_enhanced_graph():
+    """
+    Compiled enhanced graph for coroutines
+    
+    Builds the graph inside the event loop (the async savers bind to it) and runs
+    the checkpointer's async setup once, e.g. AsyncRedisSaver's search indices.
+    """
+    global _checkpointer_ready
+    graph = get_enhanced_graph()
+    if not _checkpointer_ready:
+        asetup = getattr(graph.checkpointer, "asetup", None)
+        if asetup is not None:
+            await asetup()
+        _checkpointer_ready = True
+    return graph
+
+
+def _reset_lazy_resources():
+    """Drop clients, pools and the checkpointer connection inherited across fork()"""
+    global _enhanced_graph, _enhanced_graph_lock, _checkpointer_ready
+    for accessor in (get_openai_http_clients, get_openai_model, get_gemini_model, get_summary_model):
+        accessor.cache_clear()
+    _enhanced_graph = None
+    _enhanced_graph_lock = threading.Lock()
+    _checkpointer_ready = False
+
+
+# Connection pools and SQLite handles are not safe to share with a forked child
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lazy_resources)
 
 
 # ==================== HELPER FUNCTIONS ====================
 
-def get_enhanced_response(user_message: str, thread_id: str = "default", conversation_history: list = None) -> dict:
+_HISTORY_ROLES = {'user': HumanMessage, 'assistant': AIMessage}
+
+
+async def update_rolling_summary(previous_summary: str, older_messages: list) -> str:
+    """
+    Fold conversation turns that fell out of the recent window into the rolling summary
+    
+    Args:
+        previous_summary: Summary produced on an earlier turn (may be empty)
+        older_messages: Checkpointed messages older than the recent window
+    
+    Returns:
+        Updated summary, or None if summarization fails
+    """
+    transcript = "\n".join(
+        f"{'user' if isinstance(msg, HumanMessage) else 'assistant'}: {msg.content}"
+        for msg in older_messages if msg.content
+    )
+    prompt = (
+        "Summarize this emergency-assistant conversation in at most 3 sentences. "
+        "Keep the user's name, location, injuries and the emergency situation.\n\n"
+        f"Previous summary: {previous_summary or 'None'}\n\nConversation:\n{transcript}"
+    )
+    try:
+        return (await get_summary_model().ainvoke(prompt)).content.strip()
+    except Exception as e:
+        logger.error(f"❌ Error updating rolling summary: {e}")
+        return None
+
+async def build_graph_input(user_message: str, config: dict, conversation_history: list = None) -> dict:
+    """
+    Build the graph input state for a new user turn
+    
+    Only the new user message is sent; the add_messages reducer appends it to the
+    thread history persisted by the checkpointer. The client's conversation_history
+    is used only to seed a thread the checkpointer has no record of.
+    
+    Args:
+        user_message: Current user message
+        config: Graph config carrying the thread_id
+        conversation_history: Prior chat turns from the client (cold-start seed)
+    
+    Returns:
+        Input state for the enhanced graph
+    """
+    saved_state = (await (await aget_enhanced_graph()).aget_state(config)).values
+    history = list(saved_state.get("messages", []))
+    new_messages = []
+    
+    if not history and conversation_history:
+        logger.info(f"🌱 Seeding new thread from {len(conversation_history)} history items")
+        history = [
+            _HISTORY_ROLES[msg.get('role', 'user')](content=msg['content'])
+            for msg in conversation_history
+            if msg.get('content') and msg.get('role', 'user') in _HISTORY_ROLES
+        ]
+        # The client may already include the current message at the end
+        if history and isinstance(history[-1], HumanMessage) and history[-1].content == user_message:
+            history.pop()
+        new_messages.extend(history)
+    
+    new_messages.append(HumanMessage(content=user_message))
+    
+    # Messages older than the window sent with this turn are folded into a rolling
+    # summary; the count only advances once the summary actually covers them
+    rolling_summary = saved_state.get("rolling_summary", "")
+    summarized_count = saved_state.get("summarized_count", 0)
+    older_messages = history[:max(len(history) - history_window(user_message), 0)]
+    if len(older_messages) - summarized_count >= SUMMARY_EVERY:
+        logger.info(f"🗜️ Summarizing {len(older_messages)} older messages")
+        summary = await update_rolling_summary(rolling_summary, older_messages[summarized_count:])
+        if summary is not None:
+            rolling_summary = summary
+            summarized_count = len(older_messages)
+    
+    logger.info(f"💬 Thread has {len(history) + 1} messages, sending {len(new_messages)} new")
+    
+    return {
+        "messages": new_messages,
+        "language": "",
+        "detected_language": "",
+        "language_confidence": 1.0,
+        "emergency_keywords_detected": False,
+        "emergency_matched": [],
+        "severity": "moderate",
+        "max_steps": 5,
+        "analysis_timings": {},
+        "processing_time": 0.0,
+        "final_response": "",
+        "summarization_time": 0.0,
+        "rolling_summary": rolling_summary,
+        "summarized_count": summarized_count
+    }
+
+
+def finalize_enhanced_result(result: dict, start_time: float) -> dict:
+    """
+    Assemble the response payload from the final graph state
+    
+    Args:
+        result: Final graph state
+        start_time: time.time() when the request started
+    
+    Returns:
+        Response dict returned to the chat router
+    """
+    # Extract results
+    response_message = result["messages"][-1]
+    detected_lang = result.get("detected_language", "en")
+    tool_time = result.get("processing_time", 0)
+    
+    # Get original response
+    original_response = response_message.content
+    
+    # Severity assessment that set the summary's step budget
+    max_steps = result.get("max_steps", 5)
+    severity = result.get("severity", "moderate")
+    
+    # Rebuilt from the scalar state fields; only needed for the response payload
+    tool_results = {
+        "language": detected_lang,
+        "emergency_keywords": result.get("emergency_matched", []),
+        "severity": severity
+    }
+    
+    # Summarized in the graph by finalize_response
+    final_response = result.get("final_response") or original_response
+    summarize_time = result.get("summarization_time", 0)
+    
+    total_time = (time.time() - start_time) * 1000
+    
+    # Log performance metrics
+    logger.info(f"⚡ PERFORMANCE METRICS:")
+    logger.info(f"   - Tool execution: {tool_time:.0f}ms")
+    logger.info(f"   - Summarization: {summarize_time:.0f}ms")
+    logger.info(f"   - Total time: {total_time:.0f}ms")
+    logger.info(f"   - Severity: {severity} (max {max_steps} steps)")
+    
+    # Check if response was actually shortened
+    original_lines = len([l for l in original_response.split('\n') if l.strip()])
+    final_lines = len([l for l in final_response.split('\n') if l.strip()])
+    if original_lines > final_lines:
+        logger.info(f"✂️ Response shortened: {original_lines} → {final_lines} lines")
+    
+    return {
+        "response": final_response,
+        "language": detected_lang,
+        "tool_results": tool_results,
+        "processing_time_ms": total_time,
+        "summarization_time_ms": summarize_time,
+        "severity": severity,
+        "max_steps": max_steps,
+        "parallel_execution": True
+    }
+
+
+async def get_enhanced_response(user_message: str, thread_id: str = "default", conversation_history: list = None) -> dict:
     """
     Get response using enhanced graph with parallel processing
     
@@ -513,91 +1096,67 @@ def get_enhanced_response(user_message: str, thread_id: str = "default", convers
         start_time = time.time()
         config = {"configurable": {"thread_id": thread_id}}
         
-        # Build message list from conversation history
-        message_list = []
-        if conversation_history:
-            logger.info(f"📝 Building message list from {len(conversation_history)} history items")
-            for msg in conversation_history[-10:]:  # Keep last 10 messages for context
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                if content:  # Only add non-empty messages
-                    if role == 'user':
-                        message_list.append(HumanMessage(content=content))
-                    elif role == 'assistant':
-                        message_list.append(AIMessage(content=content))
-        
-        # Ensure the current user message is included
-        if not message_list or message_list[-1].content != user_message:
-            message_list.append(HumanMessage(content=user_message))
-            logger.info(f"📨 Added current user message to list")
-        
-        logger.info(f"💬 Total messages in context: {len(message_list)}")
+        graph = await aget_enhanced_graph()
+        graph_input = await build_graph_input(user_message, config, conversation_history)
         
         # Invoke enhanced graph
-        result = enhanced_graph.invoke(
-            {
-                "messages": message_list,
-                "language": "",
-                "detected_language": "",
-                "emergency_keywords_detected": False,
-                "tool_results": {},
-                "processing_time": 0.0
-            },
-            config=config
-        )
-        
-        # Extract results
-        response_message = result["messages"][-1]
-        detected_lang = result.get("detected_language", "en")
-        tool_time = result.get("processing_time", 0)
-        tool_results = result.get("tool_results", {})
+        result = await graph.ainvoke(graph_input, config=config)
         
-        # Get original response
-        original_response = response_message.content
-        
-        # Get severity assessment to determine if we should summarize
-        severity_info = tool_results.get("severity_assessment", {})
-        max_steps = severity_info.get("max_steps", 5)
-        severity = severity_info.get("severity", "moderate")
-        
-        # Summarize if needed
-        summarize_start = time.time()
-        final_response = summarize_long_response(
-            original_response, 
-            max_steps=max_steps, 
-            language=detected_lang
-        )
-        summarize_time = (time.time() - summarize_start) * 1000
-        
-        total_time = (time.time() - start_time) * 1000
-        
-        # Log performance metrics
-        logger.info(f"⚡ PERFORMANCE METRICS:")
-        logger.info(f"   - Tool execution: {tool_time:.0f}ms")
-        logger.info(f"   - Summarization: {summarize_time:.0f}ms")
-        logger.info(f"   - Total time: {total_time:.0f}ms")
-        logger.info(f"   - Severity: {severity} (max {max_steps} steps)")
-        
-        # Check if response was actually shortened
-        original_lines = len([l for l in original_response.split('\n') if l.strip()])
-        final_lines = len([l for l in final_response.split('\n') if l.strip()])
-        if original_lines > final_lines:
-            logger.info(f"✂️ Response shortened: {original_lines} → {final_lines} lines")
+        return finalize_enhanced_result(result, start_time)
         
+    except Exception as e:
+        logger.error(f"Error in enhanced response: {e}", exc_info=True)
         return {
-            "response": final_response,
-            "language": detected_lang,
-            "tool_results": tool_results,
-            "processing_time_ms": total_time,
-            "summarization_time_ms": summarize_time,
-            "severity": severity,
-            "max_steps": max_steps,
-            "parallel_execution": True
+            "response": "An error occurred. Please try again.",
+            "language": "en",
+            "parallel_execution": False
         }
+
+
+async def stream_enhanced_response(user_message: str, thread_id: str = "default", conversation_history: list = None):
+    """
+    Stream the enhanced graph response token by token
+    
+    Yields {"token": ...} for each model chunk as it is generated, then a final
+    {"done": True, ...} event carrying the same payload as get_enhanced_response
+    (including the summarized response).
+    
+    Minor-severity replies are buffered instead of streamed: they are the only
+    ones the summarizer trims, so the client only gets the summarized text.
+    """
+    try:
+        start_time = time.time()
+        config = {"configurable": {"thread_id": thread_id}}
+        graph = await aget_enhanced_graph()
+        graph_input = await build_graph_input(user_message, config, conversation_history)
+        # The severity check runs alongside the model; hold tokens until it reports
+        stream_tokens = None
+        pending_tokens = []
+        
+        async for event in graph.astream_events(graph_input, config=config, version="v2"):
+            if event["event"] == "on_chain_end" and event["name"] == "severity_check":
+                stream_tokens = event["data"]["output"]["severity"] != "minor"
+                if stream_tokens:
+                    for token in pending_tokens:
+                        yield {"token": token}
+                pending_tokens = []
+            elif (event["event"] == "on_chat_model_stream"
+                    and event["metadata"].get("langgraph_node") in MODEL_NODES):
+                token = event["data"]["chunk"].content
+                if not token:
+                    continue
+                if stream_tokens is None:
+                    pending_tokens.append(token)
+                elif stream_tokens:
+                    yield {"token": token}
+        
+        result = (await graph.aget_state(config)).values
+        yield {"done": True, **finalize_enhanced_result(result, start_time)}
         
     except Exception as e:
-        logger.error(f"Error in enhanced response: {e}", exc_info=True)
-        return {
+        logger.error(f"Error in streamed enhanced response: {e}", exc_info=True)
+        yield {
+            "done": True,
             "response": "An error occurred. Please try again.",
             "language": "en",
             "parallel_execution": False
@@ -621,15 +1180,16 @@ def summarize_long_response(response_text: str, max_steps: int = 5, language: st
     Returns:
         Summarized response with most critical steps
     """
+    # Fast path: with at most max_steps lines there can be at most max_steps steps,
+    # so the full pass below would return the text unchanged anyway
+    if response_text.count('\n') < max_steps:
+        return response_text
+    
     start_time = time.time()
     logger.info(f"✂️ Summarizing response (max {max_steps} steps, language: {language})")
     
-    # Split by numbered list patterns
-    import re
-    
-    # Match numbered patterns like "1.", "2.", "1)", "2)", etc.
-    step_pattern = r'(?:^|\n)(\d+[\.\)])\s+'
-    steps = re.split(step_pattern, response_text)
+    # Split by numbered list patterns like "1.", "2.", "1)", "2)", etc.
+    steps = STEP_SPLIT_RE.split(response_text)
     
     # Reconstruct steps (pattern captures create alternating list)
     numbered_steps = []
@@ -657,23 +1217,13 @@ def summarize_long_response(response_text: str, max_steps: int = 5, language: st
     # Need to summarize - keep most critical steps
     logger.info(f"📝 Reducing from {len(numbered_steps)} steps to {max_steps} steps")
     
-    # Priority keywords for each language
-    critical_keywords = {
-        'en': ['call', 'emergency', '119', '110', '1990', 'bleeding', 'pressure', 
-               'ambulance', 'police', 'fire', 'danger', 'safe', 'urgent'],
-        'si': ['අමතන්න', 'හදිසි', '119', '110', '1990', 'ලේ', 'තද', 
-               'ගිලන්', 'පොලිස්', 'ගිනි', 'අනතුර', 'ආරක්ෂිත'],
-        'ta': ['அழை', 'அவசர', '119', '110', '1990', 'இரத்த', 'அழுத்த',
-               'ஆம்புலன்ஸ்', 'காவல்', 'தீ', 'ஆபத்து', 'பாதுகாப்பு']
-    }
-    
-    keywords = critical_keywords.get(language, critical_keywords['en'])
+    automaton = STEP_KEYWORD_AUTOMATONS.get(language, STEP_KEYWORD_AUTOMATONS['en'])
     
-    # Score each step by keyword importance
+    # Score each step by the number of distinct priority keywords it contains
     scored_steps = []
     for step_num, step_text in numbered_steps:
         step_lower = step_text.lower()
-        score = sum(1 for keyword in keywords if keyword in step_lower)
+        score = len({keyword for _, (_, keyword) in automaton.iter(step_lower)})
         scored_steps.append((score, step_num, step_text))
     
     # Sort by score (descending) and take top max_steps
@@ -681,13 +1231,13 @@ def summarize_long_response(response_text: str, max_steps: int = 5, language: st
     top_steps = scored_steps[:max_steps]
     
     # Re-sort by original order (implied by step number)
-    top_steps.sort(key=lambda x: int(re.search(r'\d+', x[1]).group()))
+    top_steps.sort(key=lambda x: int(STEP_NUMBER_RE.search(x[1]).group()))
     
     # Reconstruct response
     intro_text = steps[0].strip() if steps[0].strip() else ""
     
     summarized = ""
-    if intro_text and not re.match(r'^\d+[\.\)]', intro_text):
+    if intro_text and not STEP_HEAD_RE.match(intro_text):
         # Keep brief intro if exists
         intro_lines = intro_text.split('\n')[:1]  # Only first line
         summarized = '\n'.join(intro_lines) + "\n\n"
@@ -1,19 +1,23 @@
 """
 LangGraph utilities for multilingual emergency response with proper language routing.
-Uses LangGraph's state management and conditional routing for language-specific responses.
+Uses LangGraph's state management and a per-language model registry for language-specific responses.
 Sinhala requests use Google Gemini, English and Tamil use OpenAI.
 """
 
-from typing import Literal, TypedDict
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import HumanMessage, SystemMessage, BaseMessage
+from typing import TypedDict, Annotated
+from functools import lru_cache
+from langgraph.graph import StateGraph, START, END, add_messages
+from langchain_core.messages import HumanMessage, SystemMessage, BaseMessage, AIMessage, RemoveMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 import logging
 import os
+import string
 from dotenv import load_dotenv
 
+from .checkpoint_utils import BoundedMemorySaver
+
 # Load environment variables
 load_dotenv()
 
@@ -33,22 +37,48 @@ if not gemini_api_key:
     logger.error("GEMINI_API_KEY not set in environment variables.")
     raise ValueError("GEMINI_API_KEY environment variable is required for Sinhala language support")
 
-# Initialize OpenAI model for English and Tamil
-openai_model = ChatOpenAI(
-    model=os.getenv('MODEL_NAME', 'gpt-3.5-turbo'),
-    openai_api_key=openai_api_key
-)
+# Earlier thread messages sent with each new message; older ones are dropped from
+# the checkpoint, since this graph keeps no summary of them
+MAX_HISTORY = int(os.getenv('MAX_HISTORY', '4'))
+
+# Optional Gemini context cache (e.g. "cachedContents/abc123") created ahead of
+# time with the Sinhala system prompt as its system instruction. When set, the
+# prompt is served from the cache instead of being resent with every request.
+gemini_cached_content = os.getenv('GEMINI_CACHED_CONTENT')
+
 
-# Initialize Gemini model for Sinhala
-gemini_model = ChatGoogleGenerativeAI(
-    model=os.getenv('GEMINI_MODEL_NAME', 'gemini-2.5-flash'),
-    google_api_key=gemini_api_key,
-    temperature=0.7,
-    convert_system_message_to_human=True  # Gemini requires this for system messages
-)
+# Models are built on first use, so importing the module stays cheap
+@lru_cache(maxsize=None)
+def get_openai_model() -> ChatOpenAI:
+    """OpenAI chat model for English and Tamil"""
+    model = ChatOpenAI(
+        model=os.getenv('MODEL_NAME', 'gpt-3.5-turbo'),
+        openai_api_key=openai_api_key
+    )
+    logger.info("Initialized OpenAI model for English and Tamil")
+    return model
+
+
+@lru_cache(maxsize=None)
+def get_gemini_model() -> ChatGoogleGenerativeAI:
+    """Gemini chat model for Sinhala"""
+    model = ChatGoogleGenerativeAI(
+        model=os.getenv('GEMINI_MODEL_NAME', 'gemini-2.5-flash'),
+        google_api_key=gemini_api_key,
+        temperature=0.7,
+        convert_system_message_to_human=True,  # Gemini requires this for system messages
+        cached_content=gemini_cached_content
+    )
+    logger.info("Initialized Gemini model for Sinhala")
+    if gemini_cached_content:
+        logger.info(f"Using Gemini cached content {gemini_cached_content} for the Sinhala prompt")
+    return model
 
-logger.info("Initialized OpenAI model for English and Tamil")
-logger.info("Initialized Gemini model for Sinhala")
+# UTF-8 lead-byte pairs of the Sinhala (U+0D80-U+0DFF) and Tamil (U+0B80-U+0BFF)
+# blocks; counting them on the encoded bytes avoids a per-character Python loop
+SINHALA_UTF8_PREFIXES = (b'\xe0\xb6', b'\xe0\xb7')
+TAMIL_UTF8_PREFIXES = (b'\xe0\xae', b'\xe0\xaf')
+ASCII_LETTER_BYTES = string.ascii_letters.encode('ascii')
 
 
 # System prompts for each language
@@ -114,10 +144,18 @@ Respond **only in English**.""",
 பதில் **தமிழில் மட்டுமே** அளிக்கவும்."""
 }
 
+# Built once so every request reuses the same system message objects.
+# Stable prefix: the system message is always sent first and never interpolated,
+# so providers with automatic prefix caching (OpenAI) can reuse it across calls.
+SYSTEM_MESSAGES = {lang: SystemMessage(content=prompt) for lang, prompt in SYSTEM_PROMPTS.items()}
+
+# Languages whose system prompt already lives in a provider-side context cache
+CACHED_PROMPT_LANGUAGES = frozenset(['si']) if gemini_cached_content else frozenset()
+
 
 # Define the State
 class MultilingualState(TypedDict):
-    messages: list[BaseMessage]
+    messages: Annotated[list[BaseMessage], add_messages]
     language: str
     detected_language: str
 
@@ -127,16 +165,27 @@ def detect_language(text: str) -> str:
     Detects if the text is in Sinhala, Tamil, or English.
     Returns 'si' for Sinhala, 'ta' for Tamil, 'en' for English.
     """
+    # Pure-ASCII text (most English messages) cannot contain Sinhala or Tamil
+    if text.isascii():
+        return 'en'
+    return _detect_script_language(text)
+
+
+# Repeated messages (greetings, common emergencies) are answered from the cache
+@lru_cache(maxsize=4096)
+def _detect_script_language(text: str) -> str:
+    """Script-ratio detection for text that contains non-ASCII characters."""
+    data = text.encode('utf-8', 'surrogatepass')
     # Check for Sinhala characters (Unicode range: 0D80-0DFF)
-    sinhala_chars = len([c for c in text if '\u0D80' <= c <= '\u0DFF'])
+    sinhala_chars = sum(data.count(prefix) for prefix in SINHALA_UTF8_PREFIXES)
     # Check for Tamil characters (Unicode range: 0B80-0BFF)
-    tamil_chars = len([c for c in text if '\u0B80' <= c <= '\u0BFF'])
+    tamil_chars = sum(data.count(prefix) for prefix in TAMIL_UTF8_PREFIXES)
     # Check for English/Latin characters
-    english_chars = len([c for c in text if c.isalpha() and ord(c) < 128])
+    english_chars = len(data) - len(data.translate(None, ASCII_LETTER_BYTES))
     
     total_chars = sinhala_chars + tamil_chars + english_chars
     
-    logger.info(f"Language detection - Sinhala: {sinhala_chars}, Tamil: {tamil_chars}, English: {english_chars}")
+    logger.debug("Language detection - Sinhala: %d, Tamil: %d, English: %d", sinhala_chars, tamil_chars, english_chars)
     
     if total_chars == 0:
         return 'en'  # Default to English if no alphabet characters
@@ -146,7 +195,7 @@ def detect_language(text: str) -> str:
     tamil_ratio = tamil_chars / total_chars if total_chars > 0 else 0
     english_ratio = english_chars / total_chars if total_chars > 0 else 0
     
-    logger.info(f"Language ratios - Sinhala: {sinhala_ratio:.2f}, Tamil: {tamil_ratio:.2f}, English: {english_ratio:.2f}")
+    logger.debug("Language ratios - Sinhala: %.2f, Tamil: %.2f, English: %.2f", sinhala_ratio, tamil_ratio, english_ratio)
     
     # Need at least 30% of the language to consider it
     if sinhala_ratio > 0.3 and sinhala_ratio >= tamil_ratio and sinhala_ratio >= english_ratio:
@@ -159,100 +208,93 @@ def detect_language(text: str) -> str:
 
 # Node: Detect Language
 def detect_language_node(state: MultilingualState) -> MultilingualState:
-    """Node to detect the language from the user's message."""
+    """
+    Node to detect the language from the user's message.
+    
+    The thread's language is sticky: it is kept in checkpointed state and reused
+    for pure-ASCII messages ("ok", "119", romanized replies), which carry no
+    Sinhala/Tamil script to contradict it. Messages with non-ASCII text are
+    re-detected so a switch to another script is still picked up.
+    """
     last_message = state["messages"][-1]
+    if state.get("language") and isinstance(last_message, HumanMessage) and last_message.content.isascii():
+        return {}  # Keep the thread's language
     if isinstance(last_message, HumanMessage):
         detected_lang = detect_language(last_message.content)
-        logger.info(f"Detected language: {detected_lang} from message: {last_message.content[:50]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Detected language: %s from message: %s...", detected_lang, last_message.content[:50])
         return {
-            **state,
             "detected_language": detected_lang,
             "language": detected_lang  # Set the language to detected
         }
-    return state
+    return {}
 
 
-# Node: Route to appropriate language model
-def route_by_language(state: MultilingualState) -> Literal["english_model", "sinhala_model", "tamil_model"]:
-    """Conditional edge function to route based on detected language."""
-    language = state.get("detected_language", "en")
-    logger.info(f"Routing to language: {language}")
-    
-    if language == "si":
-        return "sinhala_model"
-    elif language == "ta":
-        return "tamil_model"
-    else:
-        return "english_model"
+# Error replies shown when a model call fails
+MODEL_ERROR_MESSAGES = {
+    'en': "Sorry, I encountered an error. Please try again.",
+    'si': "සමාවන්න, දෝෂයක් ඇතිවිය. කරුණාකර නැවත උත්සාහ කරන්න.",
+    'ta': "மன்னிக்கவும், பிழை ஏற்பட்டது. தயவுசெய்து மீண்டும் முயற்சிக்கவும்."
+}
 
+# Model registry: language -> (chat model accessor, label used in logs)
+LANGUAGE_MODELS = {
+    'en': (get_openai_model, "English model (OpenAI)"),
+    'si': (get_gemini_model, "Sinhala model (Google Gemini)"),
+    'ta': (get_openai_model, "Tamil model (OpenAI)")
+}
 
-# Node: English Model (uses OpenAI)
-def english_model_node(state: MultilingualState) -> MultilingualState:
-    """Process the message with English prompt using OpenAI."""
-    logger.info("Processing with English model (OpenAI)")
-    system_message = SystemMessage(content=SYSTEM_PROMPTS['en'])
-    messages = [system_message] + state["messages"]
-    
-    try:
-        response = openai_model.invoke(messages)
-        logger.info(f"English model response: {response.content[:100]}...")
-        return {
-            **state,
-            "messages": state["messages"] + [response]
-        }
-    except Exception as e:
-        logger.error(f"Error in English model: {e}", exc_info=True)
-        error_msg = SystemMessage(content="Sorry, I encountered an error. Please try again.")
-        return {
-            **state,
-            "messages": state["messages"] + [error_msg]
-        }
 
+def _model_call(state: MultilingualState):
+    """Pick the language's model and build its prompt from the recent checkpointed messages."""
+    language = state.get("detected_language") or "en"
+    get_model, model_label = LANGUAGE_MODELS.get(language, LANGUAGE_MODELS['en'])
+    model = get_model()
+    logger.debug("Processing with %s", model_label)
+    recent = state["messages"][-(MAX_HISTORY + 1):]
+    if language in CACHED_PROMPT_LANGUAGES:
+        return language, model, model_label, list(recent)
+    return language, model, model_label, [SYSTEM_MESSAGES[language], *recent]
 
-# Node: Sinhala Model (uses Google Gemini)
-def sinhala_model_node(state: MultilingualState) -> MultilingualState:
-    """Process the message with Sinhala prompt using Google Gemini."""
-    logger.info("Processing with Sinhala model (Google Gemini)")
-    system_message = SystemMessage(content=SYSTEM_PROMPTS['si'])
-    messages = [system_message] + state["messages"]
-    
+
+def _model_reply(state: MultilingualState, reply: BaseMessage) -> MultilingualState:
+    """State delta adding the reply and dropping messages that left the window."""
+    expired = state["messages"][:-(MAX_HISTORY + 1)]
+    return {"messages": [*(RemoveMessage(id=msg.id) for msg in expired), reply]}
+
+
+def _model_error(state: MultilingualState, language: str, model_label: str, e: Exception) -> MultilingualState:
+    logger.error(f"Error in {model_label}: {e}", exc_info=True)
+    # Stored as an assistant turn: Gemini rejects system messages after the first
+    return _model_reply(state, AIMessage(content=MODEL_ERROR_MESSAGES[language]))
+
+
+# Node: Answer with the model registered for the detected language
+def _model_node(state: MultilingualState) -> MultilingualState:
+    language, model, model_label, messages = _model_call(state)
     try:
-        response = gemini_model.invoke(messages)
-        logger.info(f"Sinhala model (Gemini) response: {response.content[:100]}...")
-        return {
-            **state,
-            "messages": state["messages"] + [response]
-        }
+        response = model.invoke(messages)
     except Exception as e:
-        logger.error(f"Error in Sinhala model (Gemini): {e}", exc_info=True)
-        error_msg = SystemMessage(content="සමාවන්න, දෝෂයක් ඇතිවිය. කරුණාකර නැවත උත්සාහ කරන්න.")
-        return {
-            **state,
-            "messages": state["messages"] + [error_msg]
-        }
+        return _model_error(state, language, model_label, e)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s response: %s...", model_label, response.content[:100])
+    return _model_reply(state, response)
 
 
-# Node: Tamil Model (uses OpenAI)
-def tamil_model_node(state: MultilingualState) -> MultilingualState:
-    """Process the message with Tamil prompt using OpenAI."""
-    logger.info("Processing with Tamil model (OpenAI)")
-    system_message = SystemMessage(content=SYSTEM_PROMPTS['ta'])
-    messages = [system_message] + state["messages"]
-    
+async def _amodel_node(state: MultilingualState) -> MultilingualState:
+    language, model, model_label, messages = _model_call(state)
     try:
-        response = openai_model.invoke(messages)
-        logger.info(f"Tamil model response: {response.content[:100]}...")
-        return {
-            **state,
-            "messages": state["messages"] + [response]
-        }
+        response = await model.ainvoke(messages)
     except Exception as e:
-        logger.error(f"Error in Tamil model: {e}", exc_info=True)
-        error_msg = SystemMessage(content="மன்னிக்கவும், பிழை ஏற்பட்டது. தயவுசெய்து மீண்டும் முயற்சிக்கவும்.")
-        return {
-            **state,
-            "messages": state["messages"] + [error_msg]
-        }
+        return _model_error(state, language, model_label, e)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s response: %s...", model_label, response.content[:100])
+    return _model_reply(state, response)
+
+
+# One node for every language: the dispatch is a dict lookup rather than a
+# conditional edge, and graph.ainvoke awaits the model call via the async body
+model_node = RunnableLambda(_model_node, afunc=_amodel_node)
 
 
 # Build the LangGraph
@@ -262,46 +304,61 @@ def create_multilingual_graph():
     
     # Add nodes
     workflow.add_node("detect_language", detect_language_node)
-    workflow.add_node("english_model", english_model_node)
-    workflow.add_node("sinhala_model", sinhala_model_node)
-    workflow.add_node("tamil_model", tamil_model_node)
+    workflow.add_node("model", model_node)
     
-    # Add edges
+    # Add edges: the model node picks the language's model itself
     workflow.add_edge(START, "detect_language")
-    
-    # Add conditional edges based on language
-    workflow.add_conditional_edges(
-        "detect_language",
-        route_by_language,
-        {
-            "english_model": "english_model",
-            "sinhala_model": "sinhala_model",
-            "tamil_model": "tamil_model"
-        }
-    )
-    
-    # All models end after processing
-    workflow.add_edge("english_model", END)
-    workflow.add_edge("sinhala_model", END)
-    workflow.add_edge("tamil_model", END)
+    workflow.add_edge("detect_language", "model")
+    workflow.add_edge("model", END)
     
     # Compile with memory
-    memory = MemorySaver()
+    memory = BoundedMemorySaver(max_threads=int(os.getenv('CHECKPOINT_MAX_THREADS', '1000')))
     return workflow.compile(checkpointer=memory)
 
 
-# Create the global graph instance
-multilingual_graph = create_multilingual_graph()
+@lru_cache(maxsize=None)
+def get_multilingual_graph():
+    """Compiled multilingual graph, built on first use"""
+    return create_multilingual_graph()
+
+
+def build_graph_input(user_message: str, reset_language: bool = False) -> dict:
+    """
+    Graph input for a new user message; the checkpointer supplies earlier turns
+    and the thread's sticky language. reset_language clears it so the message is
+    detected from scratch (e.g. when the user explicitly switches language).
+    """
+    graph_input = {"messages": [HumanMessage(content=user_message)]}
+    if reset_language:
+        graph_input.update({"language": "", "detected_language": ""})
+    return graph_input
+
+
+def extract_response(result: dict) -> dict:
+    """Pull the reply text and detected language out of the final graph state."""
+    response_message = result["messages"][-1]
+    detected_lang = result.get("detected_language", "en")
+    
+    # One audit line per request; the reply text itself is only logged at DEBUG
+    logger.info("Multilingual response lang=%s len=%d", detected_lang, len(response_message.content))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Final response in %s: %s...", detected_lang, response_message.content[:100])
+    
+    return {
+        "response": response_message.content,
+        "language": detected_lang
+    }
 
 
 # Helper function to get response
-def get_multilingual_response(user_message: str, thread_id: str = "default") -> dict:
+def get_multilingual_response(user_message: str, thread_id: str = "default", reset_language: bool = False) -> dict:
     """
     Get a response from the multilingual graph.
     
     Args:
         user_message: The user's message
         thread_id: Thread ID for conversation memory
+        reset_language: Forget the thread's sticky language and detect it again
         
     Returns:
         dict with 'response' (text) and 'language' (detected language)
@@ -310,25 +367,32 @@ def get_multilingual_response(user_message: str, thread_id: str = "default") ->
         config = {"configurable": {"thread_id": thread_id}}
         
         # Invoke the graph
-        result = multilingual_graph.invoke(
-            {
-                "messages": [HumanMessage(content=user_message)],
-                "language": "",
-                "detected_language": ""
-            },
-            config=config
-        )
-        
-        # Extract the response
-        response_message = result["messages"][-1]
-        detected_lang = result.get("detected_language", "en")
+        result = get_multilingual_graph().invoke(build_graph_input(user_message, reset_language), config=config)
         
-        logger.info(f"Final response in {detected_lang}: {response_message.content[:100]}...")
+        return extract_response(result)
         
+    except Exception as e:
+        logger.error(f"Error getting multilingual response: {e}", exc_info=True)
         return {
-            "response": response_message.content,
-            "language": detected_lang
+            "response": "An error occurred. Please try again.",
+            "language": "en"
         }
+
+
+async def aget_multilingual_response(user_message: str, thread_id: str = "default", reset_language: bool = False) -> dict:
+    """
+    Async variant of get_multilingual_response for use inside the event loop.
+    
+    The model call is awaited, so concurrent requests overlap their network waits
+    instead of each holding a thread.
+    """
+    try:
+        config = {"configurable": {"thread_id": thread_id}}
+        
+        # Invoke the graph
+        result = await get_multilingual_graph().ainvoke(build_graph_input(user_message, reset_language), config=config)
+        
+        return extract_response(result)
         
     except Exception as e:
         logger.error(f"Error getting multilingual response: {e}", exc_info=True)
@@ -338,6 +402,35 @@ def get_multilingual_response(user_message: str, thread_id: str = "default") ->
         }
 
 
+async def stream_multilingual_response(user_message: str, thread_id: str = "default", reset_language: bool = False):
+    """
+    Stream a response from the multilingual graph token by token.
+    
+    Yields {"token": ...} for each model chunk, then a final {"done": True, ...}
+    event with the same 'response'/'language' payload as get_multilingual_response.
+    """
+    try:
+        config = {"configurable": {"thread_id": thread_id}}
+        
+        graph = get_multilingual_graph()
+        async for event in graph.astream_events(build_graph_input(user_message, reset_language), config=config, version="v2"):
+            if event["event"] == "on_chat_model_stream":
+                token = event["data"]["chunk"].content
+                if token:
+                    yield {"token": token}
+        
+        result = (await graph.aget_state(config)).values
+        yield {"done": True, **extract_response(result)}
+        
+    except Exception as e:
+        logger.error(f"Error streaming multilingual response: {e}", exc_info=True)
+        yield {
+            "done": True,
+            "response": "An error occurred. Please try again.",
+            "language": "en"
+        }
+
+
 def clean_response(text: str) -> str:
     """Remove Markdown bold markers (**) and potential unwanted artifacts."""
     return text.replace("**", "").strip()
@@ -17,26 +17,206 @@ Agentic Characteristics:
 """
 
 import os
-import time
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from openai import OpenAI
-import json
+from openai import AsyncOpenAI
+from pydantic import BaseModel
 from twilio.rest import Client
+from .twilio_service import STATUS_CALLBACK_URL, twilio_service
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client for LLM reasoning
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-# Initialize Twilio client
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
-twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+
+
+# Clients are created on first use, so importing the agent stays cheap
+
+@lru_cache(maxsize=None)
+def get_openai_client() -> AsyncOpenAI:
+    """OpenAI client for LLM reasoning (async, so monitors share one event loop)"""
+    return AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+
+@lru_cache(maxsize=None)
+def get_twilio_client() -> Client:
+    """Twilio client for call status checks"""
+    return Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+
+
+class RateLimiter:
+    """
+    Token bucket allowing max_rate requests per time_period, in bursts of up to max_rate
+    
+    Shared by every monitor: the request slot is reserved under a thread lock and the
+    wait is an asyncio.sleep on the caller's loop, so it works across threads and loops.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.interval = time_period / max_rate
+        self.burst_tolerance = (max_rate - 1) * self.interval
+        self._next_free = 0.0  # When the bucket will be full again
+        self._lock = threading.Lock()
+    
+    async def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_free - self.burst_tolerance)
+            self._next_free = max(self._next_free, slot) + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class CircuitBreaker:
+    """
+    Fails fast after failure_threshold consecutive errors, for reset_timeout seconds
+    
+    While open, callers skip the request entirely instead of waiting on a service
+    that keeps timing out; the first request after the timeout probes it again.
+    """
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+    
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._open_until = time.monotonic() + self.reset_timeout
+                self._failures = 0
+                logger.warning("Circuit opened for %ss after %s consecutive failures",
+                               self.reset_timeout, self.failure_threshold)
+
+
+# Stay under provider rate limits during emergency storms instead of being
+# throttled by them; size these to the account's documented limits
+openai_limiter = RateLimiter(max_rate=int(os.getenv('OPENAI_RPM_LIMIT', '500')), time_period=60)
+twilio_limiter = RateLimiter(max_rate=int(os.getenv('TWILIO_RPS_LIMIT', '100')), time_period=1)
+
+# Stop polling a degraded Twilio API so recovery can move on without waiting on timeouts
+twilio_status_breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+
+# Static decision rubric for failure analysis. Sent as the system message so every
+# call starts with the same bytes and can reuse OpenAI's cached prompt prefix;
+# keep per-call details out of it.
+RECOVERY_SYSTEM_PROMPT = """You are an autonomous Reflection & Recovery Agent monitoring an emergency call. Make intelligent decisions to ensure emergency services are notified.
+
+FAILURE STATUS MEANINGS:
+- "failed": Technical error (network/system issue)
+- "busy": Number is busy/engaged
+- "no-answer": Rang but nobody picked up
+- "canceled": Call was canceled
+
+YOUR TASK:
+Analyze the failure described by the user and decide the optimal recovery strategy. Consider:
+1. Is this emergency life-threatening? (affects retry priority)
+2. Was failure likely temporary (network glitch) or persistent (line busy)?
+3. Should we retry SAME contact (if temporary) or NEXT contact (if persistent)?
+4. What's the probability of success if we retry?
+5. Should we continue trying or give up?
+
+RESPONSE FORMAT (JSON):
+{
+    "should_retry": true/false,  ← SET TRUE TO CONTINUE RECOVERY (same OR next contact), FALSE TO STOP ENTIRELY
+    "try_next_contact": true/false,  ← true = skip to next contact, false = retry same contact
+    "reasoning": "Brief explanation of your decision",
+    "success_probability": 0.0-1.0
+}
+
+⚠️ CRITICAL RULES:
+- Set should_retry=true if you want to CONTINUE trying ANY contact (same or next)
+- Set should_retry=false ONLY if you want to GIVE UP completely (e.g., exhausted all options)
+- Set try_next_contact=true if current contact is persistently failing (busy/failed)
+- Set try_next_contact=false if failure was likely temporary (retry same contact)
+
+EXAMPLES:
+- If "no-answer" on attempt 1 → should_retry=true, try_next_contact=false (retry same)
+- If "busy" on attempt 1 → should_retry=true, try_next_contact=true (skip to next contact)
+- If "failed" → should_retry=true, try_next_contact=true (technical issue, try next)
+- If attempt 4 and all failed → should_retry=false, try_next_contact=false (give up)"""
+
+# The rubric's EXAMPLES as a lookup table: (call_status, attempt) ->
+# (should_retry, try_next_contact). Situations not listed here go to the LLM.
+RECOVERY_RULES = {
+    ("no-answer", 1): (True, False),  # Retry same contact
+    ("busy", 1): (True, True),  # Skip to next contact
+    ("failed", 1): (True, True),  # Technical issue, try next
+    ("failed", 2): (True, True),
+    ("failed", 3): (True, True),
+}
+
+# Call statuses pushed by Twilio's statusCallback webhook, for calls being monitored.
+# Each monitored call has an event on its monitor's loop that is set on every push.
+_status_lock = threading.Lock()
+_status_cache: Dict[str, str] = {}
+_status_events: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+# Twilio CallContext per monitored call, so each poll only pays for the fetch
+_call_contexts: Dict[str, object] = {}
+
+
+def record_call_status(call_sid: str, status: str) -> bool:
+    """
+    Record a status delivered by Twilio's statusCallback and wake the call's monitor
+    
+    Safe to call from any thread. Returns False if the call is not being monitored.
+    """
+    with _status_lock:
+        waiter = _status_events.get(call_sid)
+        if waiter is None:
+            return False
+        _status_cache[call_sid] = status
+    loop, event = waiter
+    try:
+        loop.call_soon_threadsafe(event.set)
+    except RuntimeError:
+        pass  # Monitor's loop already closed
+    return True
+
+
+def _watch_call(call_sid: str):
+    """Accept status pushes for a call monitored on the running event loop"""
+    with _status_lock:
+        _status_events[call_sid] = (asyncio.get_running_loop(), asyncio.Event())
+
+
+def _unwatch_call(call_sid: Optional[str]):
+    with _status_lock:
+        _status_events.pop(call_sid, None)
+        _status_cache.pop(call_sid, None)
+        _call_contexts.pop(call_sid, None)
+
+
+def format_contact_list(contacts: List[Dict]) -> str:
+    """One "Name (description)" line per contact, as shown to the LLM"""
+    lines = [f"{c['name']} ({c['description']})" for c in contacts]
+    return "\n".join(lines) if lines else "None (last contact)"
+
+
+class RecoveryDecision(BaseModel):
+    """Schema of the LLM's recovery decision (see RESPONSE FORMAT in the rubric)"""
+    should_retry: bool
+    try_next_contact: bool
+    reasoning: str = ""
+    success_probability: float = 0.5
 
 
 class ReflectionRecoveryAgent:
@@ -103,24 +283,84 @@ class ReflectionRecoveryAgent:
         ]
     }
     
+    # Prompt text for every possible set of remaining backups. The remaining contacts
+    # are always a tail of the type's list, so (type, tail length) identifies them.
+    REMAINING_CONTACTS_TEXT = {
+        (emergency_type, len(contacts) - start): format_contact_list(contacts[start:])
+        for emergency_type, contacts in EMERGENCY_CONTACTS.items()
+        for start in range(len(contacts) + 1)
+    }
+    
     def __init__(self):
         """Initialize the Reflection & Recovery Agent"""
         self.max_attempts = 4  # Maximum retry attempts
         self.wait_time_seconds = 5  # Fixed 5-second wait between attempts
         self.monitoring_interval = 5  # Check call status every 5 seconds
+        # Without status callbacks, poll quickly while a call is likely to change state
+        # (the first seconds of ringing) and back off to monitoring_interval after that
+        self.poll_schedule = (0.5, 1.0, 2.0, 3.0, self.monitoring_interval)
+        self.status_callback_timeout = 30  # Max wait for a pushed status before polling
+        # Ring a backup alongside the next contact and keep whichever answers first.
+        # Off by default: it can briefly dial two emergency services for one incident.
+        self.parallel_ring = os.getenv('PARALLEL_RING', 'false').lower() == 'true'
+        self._monitor_tasks = set()  # Strong references to running monitor tasks
+        # LLM recovery decisions keyed by (status, emergency type, attempt, remaining contacts)
+        self._decision_cache = {}
         logger.info("Reflection & Recovery Agent initialized")
     
+    def start_monitoring(
+        self,
+        call_sid: str,
+        emergency_type: str,
+        user_message: str,
+        language: str = "en"
+    ):
+        """
+        Start monitoring a call in the background without blocking the caller
+        
+        Inside a running event loop the monitor is scheduled as a task, so any
+        number of monitors share that loop; otherwise it runs on a daemon thread.
+        """
+        args = (call_sid, emergency_type, user_message, language)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            threading.Thread(target=self.monitor_and_recover, args=args, daemon=True).start()
+            return
+        
+        task = loop.create_task(self.monitor_and_recover_async(*args))
+        self._monitor_tasks.add(task)
+        task.add_done_callback(self._monitor_tasks.discard)
+    
     def monitor_and_recover(
         self,
         initial_call_sid: str,
         emergency_type: str,
         user_message: str,
         language: str = "en"
+    ) -> Dict:
+        """
+        Blocking wrapper around monitor_and_recover_async for synchronous callers
+        
+        Runs its own event loop, so it must not be called from inside one; use
+        start_monitoring or await monitor_and_recover_async there instead.
+        """
+        return asyncio.run(
+            self.monitor_and_recover_async(initial_call_sid, emergency_type, user_message, language)
+        )
+    
+    async def monitor_and_recover_async(
+        self,
+        initial_call_sid: str,
+        emergency_type: str,
+        user_message: str,
+        language: str = "en"
     ) -> Dict:
         """
         Autonomously monitor emergency call and recover from failures
         
         This is the main agentic loop that pursues the goal: "Ensure emergency services are notified"
+        Waits are non-blocking, so many monitors can run on one event loop.
         
         Args:
             initial_call_sid: Twilio Call SID from initial attempt
@@ -131,134 +371,246 @@ class ReflectionRecoveryAgent:
         Returns:
             Dict with success status, attempts made, and recovery details
         """
-        logger.info(f"🤖 Reflection Agent: Starting autonomous monitoring for call {initial_call_sid}")
-        logger.info(f"   Goal: Ensure {emergency_type} services are notified")
+        logger.info("🤖 Reflection Agent: Starting autonomous monitoring for call %s", initial_call_sid)
+        logger.info("   Goal: Ensure %s services are notified", emergency_type)
         
         # Get available contacts for this emergency type
         contacts = self.EMERGENCY_CONTACTS.get(emergency_type, [])
         if not contacts:
-            logger.error(f"No emergency contacts configured for type: {emergency_type}")
+            logger.error("No emergency contacts configured for type: %s", emergency_type)
             return {
                 "success": False,
                 "error": "No emergency contacts available",
                 "attempts": 0
             }
         
-        current_call_sid = initial_call_sid
-        current_contact_index = 0
-        attempt = 1
+        callbacks_enabled = bool(STATUS_CALLBACK_URL)
         
-        # Main agentic loop - autonomous goal pursuit
-        while attempt <= self.max_attempts:
-            logger.info(f"🔍 Attempt {attempt}/{self.max_attempts}: Monitoring call {current_call_sid}")
-            
-            # AUTONOMOUS ACTION 1: Self-Monitor call status
-            call_status = self._check_call_status(current_call_sid)
-            current_contact = contacts[current_contact_index]
-            
-            logger.info(f"   Status: {call_status} | Contact: {current_contact['name']}")
-            
-            # SUCCESS - Goal achieved!
-            if call_status == "completed":
-                logger.info(f"✅ SUCCESS! Emergency call completed after {attempt} attempts")
-                return {
-                    "success": True,
-                    "attempts": attempt,
-                    "final_contact": current_contact,
-                    "call_sid": current_call_sid,
-                    "message": f"Emergency services successfully notified via {current_contact['name']}"
-                }
-            
-            # IN PROGRESS - Continue monitoring
-            elif call_status in ["queued", "ringing", "in-progress"]:
-                logger.info(f"   Call in progress, waiting {self.monitoring_interval}s before next check...")
-                time.sleep(self.monitoring_interval)
-                continue
+        current_call_sid = initial_call_sid
+        _watch_call(current_call_sid)
+        try:
+            current_contact_index = 0
+            attempt = 1
+            poll_index = 0  # Position in poll_schedule for the current call
             
-            # FAILURE - Autonomous recovery needed
-            elif call_status in ["failed", "busy", "no-answer", "canceled"]:
-                logger.warning(f"⚠️  Call failed with status: {call_status}")
+            # Main agentic loop - autonomous goal pursuit
+            while attempt <= self.max_attempts:
+                logger.info("🔍 Attempt %s/%s: Monitoring call %s", attempt, self.max_attempts, current_call_sid)
                 
-                # AUTONOMOUS ACTION 2: LLM-based failure analysis and decision making
-                recovery_decision = self._analyze_failure_and_decide(
-                    call_status=call_status,
-                    emergency_type=emergency_type,
-                    attempt=attempt,
-                    current_contact=current_contact,
-                    remaining_contacts=contacts[current_contact_index + 1:],
-                    user_message=user_message
-                )
+                # AUTONOMOUS ACTION 1: Self-Monitor call status
+                call_status = await self._check_call_status(current_call_sid)
+                current_contact = contacts[current_contact_index]
                 
-                logger.info(f"🧠 LLM Decision: {recovery_decision.get('reasoning', 'No reasoning provided')}")
+                logger.info("   Status: %s | Contact: %s", call_status, current_contact['name'])
                 
-                # Should we give up?
-                if not recovery_decision.get("should_retry", False):
-                    logger.error(f"❌ Agent decided to stop after {attempt} attempts")
+                # SUCCESS - Goal achieved!
+                if call_status == "completed":
+                    logger.info("✅ SUCCESS! Emergency call completed after %s attempts", attempt)
                     return {
-                        "success": False,
+                        "success": True,
                         "attempts": attempt,
-                        "reason": recovery_decision.get("reasoning"),
-                        "message": "Agent exhausted all recovery strategies"
+                        "final_contact": current_contact,
+                        "call_sid": current_call_sid,
+                        "message": f"Emergency services successfully notified via {current_contact['name']}"
                     }
                 
-                # AUTONOMOUS ACTION 3: Decide retry strategy
-                if recovery_decision.get("try_next_contact", False):
-                    # Move to next backup contact
-                    current_contact_index += 1
-                    if current_contact_index >= len(contacts):
-                        logger.error(f"❌ No more backup contacts available")
+                # IN PROGRESS - Continue monitoring
+                elif call_status in ["queued", "initiated", "ringing", "in-progress"]:
+                    status_wait = self._status_wait(poll_index, callbacks_enabled)
+                    poll_index += 1
+                    logger.info("   Call in progress, waiting up to %ss for a status change...", status_wait)
+                    await self._wait_for_status_change(current_call_sid, call_status, status_wait)
+                    continue
+                
+                # FAILURE - Autonomous recovery needed
+                elif call_status in ["failed", "busy", "no-answer", "canceled"]:
+                    logger.warning("⚠️  Call failed with status: %s", call_status)
+                    
+                    # AUTONOMOUS ACTION 2: LLM-based failure analysis and decision making
+                    recovery_decision = await self._analyze_failure_and_decide(
+                        call_status=call_status,
+                        emergency_type=emergency_type,
+                        attempt=attempt,
+                        current_contact=current_contact,
+                        remaining_contacts=contacts[current_contact_index + 1:],
+                        user_message=user_message
+                    )
+                    
+                    logger.info("🧠 LLM Decision: %s", recovery_decision.get('reasoning', 'No reasoning provided'))
+                    
+                    # Should we give up?
+                    if not recovery_decision.get("should_retry", False):
+                        logger.error("❌ Agent decided to stop after %s attempts", attempt)
                         return {
                             "success": False,
                             "attempts": attempt,
-                            "reason": "All emergency contacts exhausted",
-                            "message": f"Tried all {len(contacts)} available contacts"
+                            "reason": recovery_decision.get("reasoning"),
+                            "message": "Agent exhausted all recovery strategies"
                         }
                     
-                    current_contact = contacts[current_contact_index]
-                    logger.info(f"🔄 Switching to backup: {current_contact['name']}")
-                else:
-                    # Retry same contact (might be temporary issue)
-                    logger.info(f"🔄 Retrying same contact: {current_contact['name']}")
-                
-                # Wait before retry (fixed 5 seconds)
-                logger.info(f"⏳ Waiting {self.wait_time_seconds} seconds before retry...")
-                time.sleep(self.wait_time_seconds)
-                
-                # AUTONOMOUS ACTION 4: Execute retry
-                current_call_sid = self._retry_emergency_call(
-                    to_number=current_contact["number"],
-                    emergency_type=emergency_type,
-                    user_message=user_message,
-                    language=language,
-                    contact_name=current_contact["name"]
-                )
-                
-                if not current_call_sid:
-                    logger.error("❌ Failed to initiate retry call")
-                    return {
-                        "success": False,
-                        "attempts": attempt,
-                        "reason": "Retry call initiation failed",
-                        "message": "Could not create new Twilio call"
-                    }
+                    # AUTONOMOUS ACTION 3: Decide retry strategy
+                    if recovery_decision.get("try_next_contact", False):
+                        # Move to next backup contact
+                        current_contact_index += 1
+                        if current_contact_index >= len(contacts):
+                            logger.error("❌ No more backup contacts available")
+                            return {
+                                "success": False,
+                                "attempts": attempt,
+                                "reason": "All emergency contacts exhausted",
+                                "message": f"Tried all {len(contacts)} available contacts"
+                            }
+                        
+                        current_contact = contacts[current_contact_index]
+                        logger.info("🔄 Switching to backup: %s", current_contact['name'])
+                    else:
+                        # Retry same contact (might be temporary issue)
+                        logger.info("🔄 Retrying same contact: %s", current_contact['name'])
+                    
+                    # Wait before retry (fixed 5 seconds)
+                    logger.info("⏳ Waiting %s seconds before retry...", self.wait_time_seconds)
+                    await asyncio.sleep(self.wait_time_seconds)
+                    
+                    # AUTONOMOUS ACTION 4: Execute retry
+                    _unwatch_call(current_call_sid)
+                    race_backup = (
+                        self.parallel_ring
+                        and recovery_decision.get("try_next_contact", False)
+                        and current_contact_index + 1 < len(contacts)
+                    )
+                    if race_backup:
+                        current_call_sid, current_contact_index = await self._race_contacts(
+                            contacts=contacts,
+                            first_index=current_contact_index,
+                            emergency_type=emergency_type,
+                            user_message=user_message,
+                            language=language,
+                            callbacks_enabled=callbacks_enabled
+                        )
+                    else:
+                        current_call_sid = await self._retry_emergency_call(
+                            to_number=current_contact["number"],
+                            emergency_type=emergency_type,
+                            user_message=user_message,
+                            language=language,
+                            contact_name=current_contact["name"]
+                        )
+                    
+                    if not current_call_sid:
+                        logger.error("❌ Failed to initiate retry call")
+                        return {
+                            "success": False,
+                            "attempts": attempt,
+                            "reason": "Retry call initiation failed",
+                            "message": "Could not create new Twilio call"
+                        }
+                    
+                    _watch_call(current_call_sid)
+                    attempt += 1
+                    poll_index = 0
                 
-                attempt += 1
+                else:
+                    # Unknown status
+                    logger.warning("⚠️  Unknown call status: %s, waiting...", call_status)
+                    await asyncio.sleep(self.monitoring_interval)
             
-            else:
-                # Unknown status
-                logger.warning(f"⚠️  Unknown call status: {call_status}, waiting...")
-                time.sleep(self.monitoring_interval)
+            # Max attempts reached
+            logger.error("❌ Max attempts (%s) reached without success", self.max_attempts)
+            return {
+                "success": False,
+                "attempts": attempt - 1,
+                "reason": "Maximum retry attempts exceeded",
+                "message": f"Failed after {self.max_attempts} attempts across {current_contact_index + 1} contacts"
+            }
         
-        # Max attempts reached
-        logger.error(f"❌ Max attempts ({self.max_attempts}) reached without success")
-        return {
-            "success": False,
-            "attempts": attempt - 1,
-            "reason": "Maximum retry attempts exceeded",
-            "message": f"Failed after {self.max_attempts} attempts across {current_contact_index + 1} contacts"
+        finally:
+            _unwatch_call(current_call_sid)
+    
+    async def _race_contacts(
+        self,
+        contacts: List[Dict],
+        first_index: int,
+        emergency_type: str,
+        user_message: str,
+        language: str,
+        callbacks_enabled: bool
+    ) -> Tuple[Optional[str], int]:
+        """
+        Autonomous action: Ring a contact and the next backup at the same time
+        
+        The first call to be answered wins and the other one is canceled.
+        
+        Returns:
+            (call_sid, contact_index) of the winning call; if neither is answered,
+            the later contact's call so monitoring carries on from there
+        """
+        indexes = (first_index, first_index + 1)
+        logger.info("🏁 Ringing %s in parallel", ' and '.join(contacts[i]['name'] for i in indexes))
+        call_sids = await asyncio.gather(*(
+            self._retry_emergency_call(
+                to_number=contacts[i]["number"],
+                emergency_type=emergency_type,
+                user_message=user_message,
+                language=language,
+                contact_name=contacts[i]["name"]
+            )
+            for i in indexes
+        ))
+        legs = {call_sid: i for call_sid, i in zip(call_sids, indexes) if call_sid}
+        if len(legs) < 2:
+            # At most one call was placed, so there is nothing to race
+            return next(iter(legs.items()), (None, indexes[-1]))
+        
+        for call_sid in legs:
+            _watch_call(call_sid)
+        tasks = {
+            asyncio.create_task(self._wait_until_answered(call_sid, callbacks_enabled)): call_sid
+            for call_sid in legs
         }
+        winner = None
+        pending = set(tasks)
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result() in ("in-progress", "completed"):
+                        winner = tasks[task]
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+            for call_sid in legs:
+                _unwatch_call(call_sid)
+        
+        if winner is None:
+            logger.warning("⚠️  Neither parallel call was answered")
+            last_sid = max(legs, key=legs.get)
+            return last_sid, legs[last_sid]
+        
+        for call_sid in legs:
+            if call_sid != winner:
+                await twilio_limiter.acquire()
+                await asyncio.to_thread(twilio_service.cancel_emergency_call, call_sid)
+        logger.info("🏁 %s answered first: %s", contacts[legs[winner]]['name'], winner)
+        return winner, legs[winner]
     
-    def _check_call_status(self, call_sid: str) -> str:
+    async def _wait_until_answered(self, call_sid: str, callbacks_enabled: bool) -> str:
+        """Wait until a call stops ringing and return its status"""
+        poll_index = 0
+        while True:
+            call_status = await self._check_call_status(call_sid)
+            if call_status not in ("queued", "initiated", "ringing"):
+                return call_status
+            await self._wait_for_status_change(call_sid, call_status, self._status_wait(poll_index, callbacks_enabled))
+            poll_index += 1
+    
+    def _status_wait(self, poll_index: int, callbacks_enabled: bool) -> float:
+        """How long to wait for a status change before the poll_index-th check of a call"""
+        if callbacks_enabled:
+            return self.status_callback_timeout
+        return self.poll_schedule[min(poll_index, len(self.poll_schedule) - 1)]
+    
+    async def _check_call_status(self, call_sid: str) -> str:
         """
         Autonomous monitoring: Check current status of Twilio call
         
@@ -268,14 +620,83 @@ class ReflectionRecoveryAgent:
         Returns:
             Call status string (completed/failed/busy/no-answer/in-progress/etc)
         """
+        pushed_status = _status_cache.get(call_sid)
+        if pushed_status:
+            return pushed_status
+        
+        if twilio_status_breaker.is_open():
+            logger.warning("Twilio status checks suspended (circuit open), treating call %s as failed", call_sid)
+            return "failed"
+        
         try:
-            call = twilio_client.calls(call_sid).fetch()
+            call_context = _call_contexts.get(call_sid)
+            if call_context is None:
+                call_context = get_twilio_client().calls(call_sid)
+                if call_sid in _status_events:  # Only keep contexts that _unwatch_call will drop
+                    _call_contexts[call_sid] = call_context
+            # The Twilio SDK is blocking; run the HTTP request off the event loop
+            await twilio_limiter.acquire()
+            call = await asyncio.to_thread(call_context.fetch)
+            twilio_status_breaker.record_success()
             return call.status
         except Exception as e:
-            logger.error(f"Error checking call status: {e}")
+            logger.error("Error checking call status: %s", e)
+            twilio_status_breaker.record_failure()
             return "failed"
     
-    def _analyze_failure_and_decide(
+    async def _wait_for_status_change(self, call_sid: str, last_status: str, timeout: float):
+        """
+        Wait until Twilio pushes a status other than last_status, or until timeout
+        
+        On timeout the pushed status is dropped so the next check asks the REST API,
+        which also covers calls whose callbacks never arrive.
+        """
+        event = _status_events[call_sid][1]
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            event.clear()
+            if _status_cache.get(call_sid, last_status) != last_status:
+                return
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                with _status_lock:
+                    _status_cache.pop(call_sid, None)
+                return
+    
+    def _decide_by_rules(
+        self,
+        call_status: str,
+        attempt: int,
+        remaining_contacts: List[Dict]
+    ) -> Optional[Dict]:
+        """
+        Rule-based decision for the situations spelled out in the rubric's examples
+        
+        Returns None when the rules do not cover the situation and the LLM should decide.
+        """
+        if attempt >= self.max_attempts:
+            should_retry, try_next_contact = False, False
+        elif not remaining_contacts and call_status in ("busy", "failed", "canceled"):
+            # Last contact: there is no backup to move to, so keep trying this one
+            should_retry, try_next_contact = True, False
+        else:
+            rule = RECOVERY_RULES.get((call_status, attempt))
+            if rule is None:
+                return None
+            should_retry, try_next_contact = rule
+            if try_next_contact and not remaining_contacts:
+                return None  # No backup left; let the LLM weigh retrying the same contact
+        
+        return {
+            "should_retry": should_retry,
+            "try_next_contact": try_next_contact,
+            "reasoning": f"Rule for '{call_status}' on attempt {attempt}/{self.max_attempts}: "
+                         f"should_retry={should_retry}, try_next_contact={try_next_contact}"
+        }
+    
+    async def _analyze_failure_and_decide(
         self,
         call_status: str,
         emergency_type: str,
@@ -303,14 +724,30 @@ class ReflectionRecoveryAgent:
         
         Returns:
             Dict with retry decision and reasoning
+        
+        Clear-cut situations are decided by RECOVERY_RULES without an LLM call.
+        Otherwise decisions depend only on the failure situation, so an LLM
+        decision is reused for every later failure with the same status,
+        emergency type, attempt number and number of remaining backup contacts.
         """
+        rule_decision = self._decide_by_rules(call_status, attempt, remaining_contacts)
+        if rule_decision is not None:
+            logger.info("📋 Rule Decision: %s", rule_decision['reasoning'])
+            return rule_decision
+        
+        cache_key = (call_status, emergency_type, attempt, len(remaining_contacts))
+        cached_decision = self._decision_cache.get(cache_key)
+        if cached_decision is not None:
+            logger.info("🧠 Reusing cached LLM decision for %s", cache_key)
+            return dict(cached_decision)
+        
         # Format remaining contacts for LLM
-        remaining_list = [f"{c['name']} ({c['description']})" for c in remaining_contacts]
-        remaining_text = "\n".join(remaining_list) if remaining_list else "None (last contact)"
+        remaining_text = self.REMAINING_CONTACTS_TEXT.get((emergency_type, len(remaining_contacts)))
+        if remaining_text is None:
+            remaining_text = format_contact_list(remaining_contacts)
         
-        prompt = f"""You are an autonomous Reflection & Recovery Agent monitoring an emergency call.
-
-SITUATION:
+        # Only the situation varies per call; the rubric lives in the system prompt
+        prompt = f"""SITUATION:
 - Emergency Type: {emergency_type}
 - User Message: "{user_message}"
 - Current Attempt: {attempt}/{self.max_attempts}
@@ -319,74 +756,41 @@ SITUATION:
 - Remaining Backup Contacts:
 {remaining_text}
 
-FAILURE STATUS MEANINGS:
-- "failed": Technical error (network/system issue)
-- "busy": Number is busy/engaged
-- "no-answer": Rang but nobody picked up
-- "canceled": Call was canceled
-
-YOUR TASK:
-Analyze this failure and decide the optimal recovery strategy. Consider:
-1. Is this emergency life-threatening? (affects retry priority)
-2. Was failure likely temporary (network glitch) or persistent (line busy)?
-3. Should we retry SAME contact (if temporary) or NEXT contact (if persistent)?
-4. What's the probability of success if we retry?
-5. Should we continue trying or give up?
-
-RESPONSE FORMAT (JSON):
-{{
-    "should_retry": true/false,  ← SET TRUE TO CONTINUE RECOVERY (same OR next contact), FALSE TO STOP ENTIRELY
-    "try_next_contact": true/false,  ← true = skip to next contact, false = retry same contact
-    "reasoning": "Brief explanation of your decision",
-    "success_probability": 0.0-1.0
-}}
-
-⚠️ CRITICAL RULES:
-- Set should_retry=true if you want to CONTINUE trying ANY contact (same or next)
-- Set should_retry=false ONLY if you want to GIVE UP completely (e.g., exhausted all options)
-- Set try_next_contact=true if current contact is persistently failing (busy/failed)
-- Set try_next_contact=false if failure was likely temporary (retry same contact)
-
-EXAMPLES:
-- If "no-answer" on attempt 1 → should_retry=true, try_next_contact=false (retry same)
-- If "busy" on attempt 1 → should_retry=true, try_next_contact=true (skip to next contact)
-- If "failed" → should_retry=true, try_next_contact=true (technical issue, try next)
-- If attempt 4 and all failed → should_retry=false, try_next_contact=false (give up)
-
 Analyze and decide:"""
 
         try:
-            response = client.chat.completions.create(
+            await openai_limiter.acquire()
+            response = await get_openai_client().chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
-                    {"role": "system", "content": "You are an autonomous emergency call recovery agent. Make intelligent decisions to ensure emergency services are notified."},
+                    {"role": "system", "content": RECOVERY_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,  # Lower temperature for more consistent decisions
+                seed=0,  # Best-effort deterministic sampling for repeated situations
+                response_format={"type": "json_object"},  # JSON mode: the reply is always a bare JSON object
                 max_tokens=200
             )
             
             decision_text = response.choices[0].message.content.strip()
             
             # Log raw LLM response for debugging
-            logger.debug(f"🧠 Raw LLM Response: {decision_text[:500]}")
-            
-            # Parse JSON response
-            # Handle markdown code blocks if present
-            if "```json" in decision_text:
-                decision_text = decision_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in decision_text:
-                decision_text = decision_text.split("```")[1].split("```")[0].strip()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🧠 Raw LLM Response: %s", decision_text[:500])
             
-            decision = json.loads(decision_text)
+            # Parse and validate the JSON response in one pass; a malformed or
+            # incomplete decision raises and falls back to the rules below
+            decision = RecoveryDecision.model_validate_json(decision_text).model_dump()
             
             # Log the full decision for debugging
-            logger.info(f"🧠 LLM Analysis: {decision.get('reasoning', 'No reasoning')}")
-            logger.info(f"🧠 LLM Decision Details: should_retry={decision.get('should_retry')}, try_next_contact={decision.get('try_next_contact')}, success_prob={decision.get('success_probability')}")
+            logger.info("🧠 LLM Analysis: %s", decision.get('reasoning', 'No reasoning'))
+            logger.info("🧠 LLM Decision Details: should_retry=%s, try_next_contact=%s, success_prob=%s", decision.get('should_retry'), decision.get('try_next_contact'), decision.get('success_probability'))
+            # Only real LLM decisions are cached; the fallback below is not
+            self._decision_cache[cache_key] = dict(decision)
             return decision
             
         except Exception as e:
-            logger.error(f"Error in LLM failure analysis: {e}")
+            logger.error("Error in LLM failure analysis: %s", e)
             # Fallback: Simple rule-based decision
             return {
                 "should_retry": attempt < self.max_attempts,
@@ -395,7 +799,7 @@ Analyze and decide:"""
                 "success_probability": 0.5
             }
     
-    def _retry_emergency_call(
+    async def _retry_emergency_call(
         self,
         to_number: str,
         emergency_type: str,
@@ -417,13 +821,11 @@ Analyze and decide:"""
             New Call SID or None if failed
         """
         try:
-            logger.info(f"📞 Initiating retry call to {contact_name} ({to_number})")
-            
-            # Import twilio_service to create call
-            from app.twilio_service import twilio_service
+            logger.info("📞 Initiating retry call to %s (%s)", contact_name, to_number)
             
             # Use existing make_emergency_call method (returns tuple: success, call_info)
-            success, call_info = twilio_service.make_emergency_call(
+            await twilio_limiter.acquire()
+            success, call_info = await twilio_service.make_emergency_call_async(
                 to_number=to_number,
                 emergency_type=emergency_type,
                 user_message=user_message,
@@ -432,15 +834,15 @@ Analyze and decide:"""
             
             if success:
                 new_call_sid = call_info  # call_info is call_sid when success=True
-                logger.info(f"✅ Retry call initiated: {new_call_sid}")
+                logger.info("✅ Retry call initiated: %s", new_call_sid)
                 return new_call_sid
             else:
                 error_msg = call_info  # call_info is error message when success=False
-                logger.error(f"❌ Retry call failed: {error_msg}")
+                logger.error("❌ Retry call failed: %s", error_msg)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error initiating retry call: {e}")
+            logger.error("Error initiating retry call: %s", e)
             return None
 
 
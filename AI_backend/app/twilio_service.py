@@ -3,12 +3,16 @@ Twilio Voice Call Service for Emergency Situations
 Uses LLM to intelligently detect emergencies and initiate voice calls to appropriate authorities
 """
 import os
+import asyncio
 import logging
+import threading
+from collections import OrderedDict
+from functools import cached_property
 from typing import Dict, Optional, Tuple
 from twilio.rest import Client
 from dotenv import load_dotenv
 import json
-from app.db_utils import save_emergency_call, update_call_status
+from .db_utils import save_emergency_call, update_call_status
 
 load_dotenv()
 
@@ -19,6 +23,19 @@ TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '+15673721765')
 
+# Call status webhook: Twilio POSTs every status change here, so the Reflection
+# Agent can wait for updates instead of polling. Twilio cannot reach localhost,
+# so callbacks are only requested when BASE_URL is public (e.g. ngrok).
+_base_url = os.getenv('BASE_URL', 'http://localhost:8000')
+STATUS_CALLBACK_URL = (
+    None if 'localhost' in _base_url or '127.0.0.1' in _base_url
+    else f"{_base_url.rstrip('/')}/call_status_callback"
+)
+STATUS_CALLBACK_EVENTS = ['initiated', 'ringing', 'answered', 'completed']
+
+# Emergency detection results cached per normalized message (LRU)
+DETECTION_CACHE_SIZE = int(os.getenv('DETECTION_CACHE_SIZE', '4096'))
+
 # Emergency Service Numbers in Sri Lanka (configurable via .env)
 EMERGENCY_NUMBERS = {
     'police': os.getenv('EMERGENCY_POLICE_NUMBER', '+94119'),        # Default: Sri Lanka Police
@@ -26,8 +43,10 @@ EMERGENCY_NUMBERS = {
     'ambulance': os.getenv('EMERGENCY_AMBULANCE_NUMBER', '+941990')  # Default: Suwa Seriya Ambulance
 }
 
-# Emergency detection prompt for LLM
-EMERGENCY_DETECTION_PROMPT = """You are an emergency detection AI assistant for Sri Lanka. Your job is to analyze user messages and determine if they require an emergency call to authorities.
+# Emergency detection instructions for the LLM. Sent as a static system message with
+# the user message in its own message after it, so every request starts with the
+# same bytes and OpenAI can serve the prefix from its prompt cache.
+EMERGENCY_DETECTION_SYSTEM_PROMPT = """You are an emergency detection AI assistant for Sri Lanka. Your job is to analyze user messages and determine if they require an emergency call to authorities.
 
 ⚠️ IMPORTANT: A user message may contain MULTIPLE emergencies (e.g., "Fire AND people injured!"). Detect ALL emergencies present.
 
@@ -36,7 +55,7 @@ Available Emergency Services in Sri Lanka:
 2. Fire Department (110) - For fires, gas leaks, building collapses, explosions
 3. Ambulance/Medical (1990 - Suwa Seriya) - For medical emergencies, injuries, accidents, health issues
 
-Analyze the following user message and determine:
+Analyze the user message that follows and determine:
 1. Is this an ACTUAL emergency requiring immediate authority contact? (not just a question or minor issue)
 2. What is the SEVERITY level?
 3. Which emergency service(s) should be called? (MAY BE MULTIPLE!)
@@ -70,45 +89,43 @@ IMPORTANT DECISION RULES:
 - Questions about emergency services → NOT an emergency
 - When in doubt about severity → It's NOT an emergency (be conservative)
 
-User Message: "{message}"
-
 Respond ONLY with valid JSON in this exact format (no extra text):
 
 FOR SINGLE EMERGENCY:
-{{
+{
     "is_emergency": true/false,
     "emergencies": [
-        {{
+        {
             "type": "police/fire/ambulance",
             "severity": "minor/moderate/severe",
             "confidence": 0.0-1.0,
             "reasoning": "why this service is needed"
-        }}
+        }
     ],
     "language": "en/si/ta",
     "total_count": 1
-}}
+}
 
 FOR MULTIPLE EMERGENCIES:
-{{
+{
     "is_emergency": true,
     "emergencies": [
-        {{
+        {
             "type": "fire",
             "severity": "severe",
             "confidence": 0.95,
             "reasoning": "building on fire"
-        }},
-        {{
+        },
+        {
             "type": "ambulance",
             "severity": "severe",
             "confidence": 0.90,
             "reasoning": "people injured/trapped"
-        }}
+        }
     ],
     "language": "en",
     "total_count": 2
-}}
+}
 
 EXAMPLES:
 - "Fire in building!" → 1 emergency (fire only)
@@ -117,41 +134,158 @@ EXAMPLES:
 - "Robbery in progress" → 1 emergency (police only)
 - "Someone breaking in and I'm hurt" → 2 emergencies (police + ambulance)"""
 
+# TwiML for emergency calls, built once instead of per call.
+# Only the intro varies by emergency type, so it is precomputed per type.
+CALL_INTRO_TEMPLATE = """This is an emergency call from Crime Guard Emergency Assistant. 
+A user has requested {emergency_type} assistance."""
+
+# User message as gTTS audio played with <Play>
+TWIML_AUDIO_TEMPLATE = '''<Response>
+    <Say voice="Polly.Aditi" language="en-IN">{intro}</Say>
+    <Pause length="1"/>
+    <Say voice="Polly.Aditi" language="en-IN">The user's message follows:</Say>
+    <Pause length="1"/>
+    <Play>{audio_url}</Play>
+    <Pause length="1"/>
+    <Say voice="Polly.Aditi" language="en-IN">Please assist immediately.</Say>
+    <Pause length="1"/>
+    <Say voice="Polly.Aditi" language="en-IN">Playing message again:</Say>
+    <Play>{audio_url}</Play>
+    <Pause length="2"/>
+    <Hangup/>
+</Response>'''
+
+# Fallback: user message read out by Twilio TTS
+TWIML_TEXT_TEMPLATE = '''<Response>
+    <Say voice="Polly.Aditi" language="en-IN">{intro}</Say>
+    <Pause length="1"/>
+    <Say voice="Polly.Aditi" language="en-IN">The user said: {message}</Say>
+    <Pause length="1"/>
+    <Say voice="Polly.Aditi" language="en-IN">Please assist immediately.</Say>
+    <Pause length="2"/>
+    <Say voice="Polly.Aditi" language="en-IN">Repeating: {message}</Say>
+    <Pause length="2"/>
+    <Hangup/>
+</Response>'''
+
+# No user message
+TWIML_INTRO_ONLY_TEMPLATE = '''<Response>
+    <Say voice="Polly.Aditi" language="en-IN">{intro} Please assist immediately.</Say>
+    <Pause length="2"/>
+    <Hangup/>
+</Response>'''
+
+CALL_INTROS = {
+    emergency_type: CALL_INTRO_TEMPLATE.format(emergency_type=emergency_type)
+    for emergency_type in EMERGENCY_NUMBERS
+}
+TWIML_INTRO_ONLY = {
+    emergency_type: TWIML_INTRO_ONLY_TEMPLATE.format(intro=intro)
+    for emergency_type, intro in CALL_INTROS.items()
+}
+
+# Service names and chat replies shown when a call is placed, per emergency type
+SERVICE_NAMES = {
+    'police': {
+        'en': 'Police',
+        'si': 'පොලිසිය',
+        'ta': 'காவல்துறை'
+    },
+    'fire': {
+        'en': 'Fire Department',
+        'si': 'ගිනි නිවීමේ සේවාව',
+        'ta': 'தீயணைப்பு துறை'
+    },
+    'ambulance': {
+        'en': 'Ambulance',
+        'si': 'ගිලන් රථ සේවාව',
+        'ta': 'ஆம்புலன்ஸ்'
+    }
+}
+
+EMERGENCY_RESPONSES = {
+    'police': {
+        'en': "🚨 EMERGENCY CALL INITIATED 🚨\n\nI'm calling the Police (119) on your behalf right now. Please stay on the line and speak with the authorities when they answer.\n\nDirect Number: 119\nService: Sri Lanka Police",
+        'si': "🚨 හදිසි ඇමතුම ආරම්භ කර ඇත 🚨\n\nමම දැන් ඔබ වෙනුවෙන් පොලිසියට (119) ඇමතුම් කරමින් සිටිමි. කරුණාකර රැඳී සිටින්න.\n\nසෘජු අංකය: 119\nසේවාව: ශ්‍රී ලංකා පොලිසිය",
+        'ta': "🚨 அவசர அழைப்பு தொடங்கப்பட்டது 🚨\n\nநான் இப்போது உங்கள் சார்பாக காவல்துறையை (119) அழைக்கிறேன். தயவுசெய்து காத்திருங்கள்.\n\nநேரடி எண்: 119\nசேவை: இலங்கை காவல்துறை"
+    },
+    'fire': {
+        'en': "🚨 EMERGENCY CALL INITIATED 🚨\n\nI'm calling the Fire & Rescue Service (110) on your behalf right now. Please evacuate to safety immediately if possible.\n\nDirect Number: 110\nService: Sri Lanka Fire & Rescue",
+        'si': "🚨 හදිසි ඇමතුම ආරම්භ කර ඇත 🚨\n\nමම දැන් ඔබ වෙනුවෙන් ගිනි නිවීමේ සේවාවට (110) ඇමතුම් කරමින් සිටිමි. හැකි නම් වහාම ආරක්ෂිත ස්ථානයකට යන්න.\n\nසෘජු අංකය: 110\nසේවාව: ශ්‍රී ලංකා ගිනි නිවීමේ සේවාව",
+        'ta': "🚨 அவசர அழைப்பு தொடங்கப்பட்டது 🚨\n\nநான் இப்போது உங்கள் சார்பாக தீயணைப்பு சேவையை (110) அழைக்கிறேன். உடனடியாக பாதுகாப்பான இடத்திற்கு செல்லவும்.\n\nநேரடி எண்: 110\nசேவை: இலங்கை தீயணைப்பு சேவை"
+    },
+    'ambulance': {
+        'en': "🚨 EMERGENCY CALL INITIATED 🚨\n\nI'm calling the Ambulance Service - Suwa Seriya (1990) on your behalf right now. Medical help is on the way.\n\nDirect Number: 1990\nService: Suwa Seriya Ambulance",
+        'si': "🚨 හදිසි ඇමතුම ආරම්භ කර ඇත 🚨\n\nමම දැන් ඔබ වෙනුවෙන් ගිලන් රථ සේවාව - සුව සැරිය (1990) ඇමතුම් කරමින් සිටිමි. වෛද්‍ය ආධාර එළඹෙමින් පවතී.\n\nසෘජු අංකය: 1990\nසේවාව: සුව සැරිය ගිලන් රථ සේවාව",
+        'ta': "🚨 அவசர அழைப்பு தொடங்கப்பட்டது 🚨\n\nநான் இப்போது உங்கள் சார்பாக ஆம்புலன்ஸ் சேவை - சுவ செரியாவை (1990) அழைக்கிறேன். மருத்துவ உதவி வருகிறது.\n\nநேரடி எண்: 1990\nசேவை: சுவ செரியா ஆம்புலன்ஸ்"
+    }
+}
+
+# Flat (emergency type, language) lookups with the English fallback baked in
+SUPPORTED_LANGUAGES = ('en', 'si', 'ta')
+SERVICE_NAME_BY_LANGUAGE = {
+    (emergency_type, language): names.get(language, names['en'])
+    for emergency_type, names in SERVICE_NAMES.items()
+    for language in SUPPORTED_LANGUAGES
+}
+RESPONSE_TEXT_BY_LANGUAGE = {
+    (emergency_type, language): texts.get(language, texts['en'])
+    for emergency_type, texts in EMERGENCY_RESPONSES.items()
+    for language in SUPPORTED_LANGUAGES
+}
+
 
 class TwilioCallService:
     """Service to handle emergency voice calls via Twilio"""
     
     def __init__(self):
-        """Initialize Twilio client and LLM for emergency detection"""
+        """
+        Initialize the service
+        
+        The Twilio client and the detection LLM are created on first use, so
+        importing this module (and the singleton below) stays cheap.
+        """
+        # Detection verdicts keyed by normalized message, stored as tuples so
+        # callers always get fresh dicts they are free to modify
+        self._detection_cache = OrderedDict()
+        self._detection_lock = threading.Lock()
+    
+    @cached_property
+    def client(self) -> Optional[Client]:
+        """Twilio client, created on first use (None if not configured)"""
         if not TWILIO_ACCOUNT_SID or not TWILIO_AUTH_TOKEN:
             logger.warning("Twilio credentials not configured. Call service will not work.")
-            self.client = None
-        else:
-            try:
-                self.client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-                logger.info("Twilio client initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize Twilio client: {e}")
-                self.client = None
-        
-        # Initialize LLM for emergency detection
+            return None
+        try:
+            client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+            logger.info("Twilio client initialized successfully")
+            return client
+        except Exception as e:
+            logger.error(f"Failed to initialize Twilio client: {e}")
+            return None
+    
+    @cached_property
+    def emergency_llm(self):
+        """LLM for emergency detection, created on first use (None on failure)"""
         try:
             from langchain_openai import ChatOpenAI
-            self.emergency_llm = ChatOpenAI(
+            llm = ChatOpenAI(
                 model="gpt-4o-mini",  # Fast and cost-effective for classification
                 temperature=0.1,  # Low temperature for consistent detection
                 max_tokens=200
             )
             logger.info("Emergency detection LLM initialized (GPT-4o-mini)")
+            return llm
         except Exception as e:
             logger.error(f"Failed to initialize emergency detection LLM: {e}")
-            self.emergency_llm = None
+            return None
     
     def detect_emergency_intent(self, message: str) -> Optional[Dict]:
         """
         Use LLM to intelligently detect if the message requires emergency call(s)
         
         NOW SUPPORTS MULTIPLE EMERGENCIES (e.g., "Fire AND people injured!")
+        Verdicts are cached per normalized message (case and whitespace ignored).
         
         Args:
             message: User's message to analyze
@@ -171,91 +305,135 @@ class TwilioCallService:
             logger.error("Emergency detection LLM not initialized")
             return None
         
+        # Retyped or pasted messages, and the post-call logging lookup in
+        # make_emergency_call, reuse the earlier verdict instead of asking the LLM again
+        cache_key = ' '.join(message.lower().split())
+        with self._detection_lock:
+            if cache_key in self._detection_cache:
+                self._detection_cache.move_to_end(cache_key)
+                logger.info(f"🔍 Emergency detection cache hit: {message[:100]}...")
+                return self._unpack_detection(self._detection_cache[cache_key])
+        
         try:
-            # Create the detection prompt
-            prompt = EMERGENCY_DETECTION_PROMPT.format(message=message)
-            
-            logger.info(f"🔍 Analyzing message for emergency: {message[:100]}...")
-            
-            # Get LLM response
-            response = self.emergency_llm.invoke(prompt)
-            response_text = response.content.strip()
-            
-            logger.debug(f"LLM Response: {response_text}")
-            
-            # Parse JSON response
-            try:
-                # Extract JSON from response (in case there's extra text)
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-                if json_start != -1 and json_end > json_start:
-                    json_str = response_text[json_start:json_end]
-                    result = json.loads(json_str)
-                else:
-                    logger.error("No JSON found in LLM response")
-                    return None
-                
-                # Check if it's an emergency
-                is_emergency = result.get('is_emergency', False)
-                emergencies_list = result.get('emergencies', [])
-                language = result.get('language', 'en')
-                total_count = result.get('total_count', 0)
-                
-                if not is_emergency or not emergencies_list:
-                    logger.info(f"ℹ️ Not an emergency")
-                    return None
-                
-                # Filter severe emergencies with high confidence
-                severe_emergencies = []
-                for emerg in emergencies_list:
-                    emerg_type = emerg.get('type', 'none')
-                    severity = emerg.get('severity', 'minor')
-                    confidence = emerg.get('confidence', 0.0)
-                    reasoning = emerg.get('reasoning', '')
-                    
-                    logger.info(f"📊 Emergency #{len(severe_emergencies) + 1}:")
-                    logger.info(f"   Type: {emerg_type}")
-                    logger.info(f"   Severity: {severity}")
-                    logger.info(f"   Confidence: {confidence}")
-                    logger.info(f"   Reasoning: {reasoning}")
-                    
-                    # Only include severe emergencies with high confidence
-                    if (severity == 'severe' and 
-                        confidence >= 0.7 and 
-                        emerg_type in EMERGENCY_NUMBERS):
-                        severe_emergencies.append({
-                            'type': emerg_type,
-                            'number': EMERGENCY_NUMBERS[emerg_type],
-                            'severity': severity,
-                            'confidence': confidence,
-                            'reasoning': reasoning
-                        })
-                        logger.info(f"   ✅ SEVERE emergency - will call {emerg_type}")
-                    elif severity in ['minor', 'moderate']:
-                        logger.info(f"   ℹ️ {severity.upper()} issue - providing advice only")
-                    else:
-                        logger.info(f"   ⚠️ Filtered out (low confidence or invalid type)")
-                
-                # Return result
-                if severe_emergencies:
-                    logger.info(f"✅ {len(severe_emergencies)} SEVERE emergencies detected (language: {language})")
-                    return {
-                        'emergencies': severe_emergencies,
-                        'language': language,
-                        'total_count': len(severe_emergencies)
-                    }
-                else:
-                    logger.info(f"ℹ️ No severe emergencies detected")
-                    return None
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM JSON response: {e}")
-                logger.error(f"Response was: {response_text}")
-                return None
-                
+            detection = self._detect_with_llm(message)
         except Exception as e:
+            # Failures are not cached, so the next attempt asks the LLM again
             logger.error(f"Error in emergency detection: {e}", exc_info=True)
             return None
+        
+        with self._detection_lock:
+            self._detection_cache[cache_key] = detection
+            self._detection_cache.move_to_end(cache_key)
+            if len(self._detection_cache) > DETECTION_CACHE_SIZE:
+                self._detection_cache.popitem(last=False)
+        
+        return self._unpack_detection(detection)
+    
+    async def detect_emergency_intent_async(self, message: str) -> Optional[Dict]:
+        """
+        detect_emergency_intent for async callers
+        
+        A cache miss is a blocking OpenAI round trip, so detection runs on a
+        worker thread and the event loop keeps serving other chats meanwhile.
+        """
+        return await asyncio.to_thread(self.detect_emergency_intent, message)
+    
+    @staticmethod
+    def _unpack_detection(detection: Optional[Tuple]) -> Optional[Dict]:
+        """Rebuild the detect_emergency_intent dict from a cached (emergencies, language) tuple"""
+        if detection is None:
+            return None
+        emergencies, language = detection
+        return {
+            'emergencies': [dict(emergency) for emergency in emergencies],
+            'language': language,
+            'total_count': len(emergencies)
+        }
+    
+    def _detect_with_llm(self, message: str) -> Optional[Tuple]:
+        """
+        Ask the LLM whether the message is an emergency
+        
+        Returns:
+            (emergencies, language) with each severe emergency as a tuple of
+            (key, value) pairs, or None if there is no severe emergency.
+            Raises if the LLM call fails or its response cannot be parsed.
+        """
+        from langchain_core.messages import HumanMessage, SystemMessage
+        
+        logger.info(f"🔍 Analyzing message for emergency: {message[:100]}...")
+        
+        # Get LLM response (static instructions first, user message last)
+        response = self.emergency_llm.invoke([
+            SystemMessage(content=EMERGENCY_DETECTION_SYSTEM_PROMPT),
+            HumanMessage(content=message)
+        ])
+        response_text = response.content.strip()
+        
+        logger.debug(f"LLM Response: {response_text}")
+        
+        # Parse JSON response
+        try:
+            # Extract JSON from response (in case there's extra text)
+            json_start = response_text.find('{')
+            json_end = response_text.rfind('}') + 1
+            if json_start != -1 and json_end > json_start:
+                json_str = response_text[json_start:json_end]
+                result = json.loads(json_str)
+            else:
+                raise ValueError("No JSON found in LLM response")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM JSON response: {e}")
+            logger.error(f"Response was: {response_text}")
+            raise
+        
+        # Check if it's an emergency
+        is_emergency = result.get('is_emergency', False)
+        emergencies_list = result.get('emergencies', [])
+        language = result.get('language', 'en')
+        
+        if not is_emergency or not emergencies_list:
+            logger.info(f"ℹ️ Not an emergency")
+            return None
+        
+        # Filter severe emergencies with high confidence
+        severe_emergencies = []
+        for emerg in emergencies_list:
+            emerg_type = emerg.get('type', 'none')
+            severity = emerg.get('severity', 'minor')
+            confidence = emerg.get('confidence', 0.0)
+            reasoning = emerg.get('reasoning', '')
+            
+            logger.info(f"📊 Emergency #{len(severe_emergencies) + 1}:")
+            logger.info(f"   Type: {emerg_type}")
+            logger.info(f"   Severity: {severity}")
+            logger.info(f"   Confidence: {confidence}")
+            logger.info(f"   Reasoning: {reasoning}")
+            
+            # Only include severe emergencies with high confidence
+            if (severity == 'severe' and 
+                confidence >= 0.7 and 
+                emerg_type in EMERGENCY_NUMBERS):
+                severe_emergencies.append((
+                    ('type', emerg_type),
+                    ('number', EMERGENCY_NUMBERS[emerg_type]),
+                    ('severity', severity),
+                    ('confidence', confidence),
+                    ('reasoning', reasoning)
+                ))
+                logger.info(f"   ✅ SEVERE emergency - will call {emerg_type}")
+            elif severity in ['minor', 'moderate']:
+                logger.info(f"   ℹ️ {severity.upper()} issue - providing advice only")
+            else:
+                logger.info(f"   ⚠️ Filtered out (low confidence or invalid type)")
+        
+        # Return result
+        if severe_emergencies:
+            logger.info(f"✅ {len(severe_emergencies)} SEVERE emergencies detected (language: {language})")
+            return tuple(severe_emergencies), language
+        else:
+            logger.info(f"ℹ️ No severe emergencies detected")
+            return None
     
     def make_emergency_call(
         self, 
@@ -288,8 +466,7 @@ class TwilioCallService:
             from .audio_manager import audio_manager
             
             # Base intro message
-            intro = f"""This is an emergency call from Crime Guard Emergency Assistant. 
-A user has requested {emergency_type} assistance."""
+            intro = CALL_INTROS.get(emergency_type) or CALL_INTRO_TEMPLATE.format(emergency_type=emergency_type)
             
             # Generate audio URL if user message is provided
             audio_url = None
@@ -328,49 +505,31 @@ A user has requested {emergency_type} assistance."""
             if audio_url:
                 # Use gTTS audio with <Play> tag
                 logger.info(f"🎤 Using gTTS audio playback")
-                twiml = f'''<Response>
-    <Say voice="Polly.Aditi" language="en-IN">{intro}</Say>
-    <Pause length="1"/>
-    <Say voice="Polly.Aditi" language="en-IN">The user's message follows:</Say>
-    <Pause length="1"/>
-    <Play>{audio_url}</Play>
-    <Pause length="1"/>
-    <Say voice="Polly.Aditi" language="en-IN">Please assist immediately.</Say>
-    <Pause length="1"/>
-    <Say voice="Polly.Aditi" language="en-IN">Playing message again:</Say>
-    <Play>{audio_url}</Play>
-    <Pause length="2"/>
-    <Hangup/>
-</Response>'''
+                twiml = TWIML_AUDIO_TEMPLATE.format(intro=intro, audio_url=audio_url)
             elif user_message and len(user_message.strip()) > 0:
                 # Fallback: Use Twilio TTS if gTTS failed
                 logger.warning(f"⚠️ Falling back to Twilio TTS")
                 safe_message = user_message[:200] if len(user_message) > 200 else user_message
                 safe_message = safe_message.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
                 
-                twiml = f'''<Response>
-    <Say voice="Polly.Aditi" language="en-IN">{intro}</Say>
-    <Pause length="1"/>
-    <Say voice="Polly.Aditi" language="en-IN">The user said: {safe_message}</Say>
-    <Pause length="1"/>
-    <Say voice="Polly.Aditi" language="en-IN">Please assist immediately.</Say>
-    <Pause length="2"/>
-    <Say voice="Polly.Aditi" language="en-IN">Repeating: {safe_message}</Say>
-    <Pause length="2"/>
-    <Hangup/>
-</Response>'''
+                twiml = TWIML_TEXT_TEMPLATE.format(intro=intro, message=safe_message)
             else:
                 # No user message
                 logger.info(f"ℹ️ No user message provided")
-                twiml = f'''<Response>
-    <Say voice="Polly.Aditi" language="en-IN">{intro} Please assist immediately.</Say>
-    <Pause length="2"/>
-    <Hangup/>
-</Response>'''
+                twiml = TWIML_INTRO_ONLY.get(emergency_type) or TWIML_INTRO_ONLY_TEMPLATE.format(intro=intro)
             
             logger.info(f"📞 Making emergency call to {to_number}...")
             logger.debug(f"TwiML: {twiml}")
             
+            # Report status changes to our webhook when it is reachable
+            status_callback_args = {}
+            if STATUS_CALLBACK_URL:
+                status_callback_args = {
+                    'status_callback': STATUS_CALLBACK_URL,
+                    'status_callback_event': STATUS_CALLBACK_EVENTS,
+                    'status_callback_method': 'POST'
+                }
+            
             # Make the call directly to emergency number
             # The person answering the call will hear the TwiML
             call = self.client.calls.create(
@@ -378,7 +537,8 @@ A user has requested {emergency_type} assistance."""
                 to=to_number,
                 from_=TWILIO_PHONE_NUMBER,
                 record=True,  # Record for logging purposes
-                recording_status_callback=None  # Can add URL for recording notification
+                recording_status_callback=None,  # Can add URL for recording notification
+                **status_callback_args
             )
             
             logger.info(f"✅ Emergency call initiated: SID={call.sid}")
@@ -419,6 +579,30 @@ A user has requested {emergency_type} assistance."""
             logger.error(f"Failed to make emergency call: {e}", exc_info=True)
             return False, str(e)
     
+    async def make_emergency_call_async(
+        self, 
+        to_number: str, 
+        emergency_type: str,
+        user_message: Optional[str] = None,
+        language: str = 'en',
+        user_phone: Optional[str] = None
+    ) -> Tuple[bool, str]:
+        """
+        make_emergency_call for async callers
+        
+        The Twilio SDK is blocking, so the call is placed on a worker thread and
+        the event loop keeps serving other chats during the round trip. The
+        shared client's pooled session keeps its keep-alive connection to Twilio.
+        """
+        return await asyncio.to_thread(
+            self.make_emergency_call,
+            to_number=to_number,
+            emergency_type=emergency_type,
+            user_message=user_message,
+            language=language,
+            user_phone=user_phone
+        )
+    
     def cancel_emergency_call(self, call_sid: str) -> Tuple[bool, str]:
         """
         Cancel an ongoing emergency call
@@ -496,25 +680,8 @@ A user has requested {emergency_type} assistance."""
         Returns:
             Service name in appropriate language
         """
-        service_names = {
-            'police': {
-                'en': 'Police',
-                'si': 'පොලිසිය',
-                'ta': 'காவல்துறை'
-            },
-            'fire': {
-                'en': 'Fire Department',
-                'si': 'ගිනි නිවීමේ සේවාව',
-                'ta': 'தீயணைப்பு துறை'
-            },
-            'ambulance': {
-                'en': 'Ambulance',
-                'si': 'ගිලන් රථ සේවාව',
-                'ta': 'ஆம்புலன்ஸ்'
-            }
-        }
-        
-        return service_names.get(emergency_type, {}).get(language, service_names.get(emergency_type, {}).get('en', emergency_type))
+        return (SERVICE_NAME_BY_LANGUAGE.get((emergency_type, language))
+                or SERVICE_NAME_BY_LANGUAGE.get((emergency_type, 'en'), emergency_type))
     
     def get_emergency_response_text(self, emergency_type: str, language: str = 'en') -> str:
         """
@@ -527,25 +694,8 @@ A user has requested {emergency_type} assistance."""
         Returns:
             Response message in appropriate language
         """
-        responses = {
-            'police': {
-                'en': f"🚨 EMERGENCY CALL INITIATED 🚨\n\nI'm calling the Police (119) on your behalf right now. Please stay on the line and speak with the authorities when they answer.\n\nDirect Number: 119\nService: Sri Lanka Police",
-                'si': f"🚨 හදිසි ඇමතුම ආරම්භ කර ඇත 🚨\n\nමම දැන් ඔබ වෙනුවෙන් පොලිසියට (119) ඇමතුම් කරමින් සිටිමි. කරුණාකර රැඳී සිටින්න.\n\nසෘජු අංකය: 119\nසේවාව: ශ්‍රී ලංකා පොලිසිය",
-                'ta': f"🚨 அவசர அழைப்பு தொடங்கப்பட்டது 🚨\n\nநான் இப்போது உங்கள் சார்பாக காவல்துறையை (119) அழைக்கிறேன். தயவுசெய்து காத்திருங்கள்.\n\nநேரடி எண்: 119\nசேவை: இலங்கை காவல்துறை"
-            },
-            'fire': {
-                'en': f"🚨 EMERGENCY CALL INITIATED 🚨\n\nI'm calling the Fire & Rescue Service (110) on your behalf right now. Please evacuate to safety immediately if possible.\n\nDirect Number: 110\nService: Sri Lanka Fire & Rescue",
-                'si': f"🚨 හදිසි ඇමතුම ආරම්භ කර ඇත 🚨\n\nමම දැන් ඔබ වෙනුවෙන් ගිනි නිවීමේ සේවාවට (110) ඇමතුම් කරමින් සිටිමි. හැකි නම් වහාම ආරක්ෂිත ස්ථානයකට යන්න.\n\nසෘජු අංකය: 110\nසේවාව: ශ්‍රී ලංකා ගිනි නිවීමේ සේවාව",
-                'ta': f"🚨 அவசர அழைப்பு தொடங்கப்பட்டது 🚨\n\nநான் இப்போது உங்கள் சார்பாக தீயணைப்பு சேவையை (110) அழைக்கிறேன். உடனடியாக பாதுகாப்பான இடத்திற்கு செல்லவும்.\n\nநேரடி எண்: 110\nசேவை: இலங்கை தீயணைப்பு சேவை"
-            },
-            'ambulance': {
-                'en': f"🚨 EMERGENCY CALL INITIATED 🚨\n\nI'm calling the Ambulance Service - Suwa Seriya (1990) on your behalf right now. Medical help is on the way.\n\nDirect Number: 1990\nService: Suwa Seriya Ambulance",
-                'si': f"🚨 හදිසි ඇමතුම ආරම්භ කර ඇත 🚨\n\nමම දැන් ඔබ වෙනුවෙන් ගිලන් රථ සේවාව - සුව සැරිය (1990) ඇමතුම් කරමින් සිටිමි. වෛද්‍ය ආධාර එළඹෙමින් පවතී.\n\nසෘජු අංකය: 1990\nසේවාව: සුව සැරිය ගිලන් රථ සේවාව",
-                'ta': f"🚨 அவசர அழைப்பு தொடங்கப்பட்டது 🚨\n\nநான் இப்போது உங்கள் சார்பாக ஆம்புலன்ஸ் சேவை - சுவ செரியாவை (1990) அழைக்கிறேன். மருத்துவ உதவி வருகிறது.\n\nநேரடி எண்: 1990\nசேவை: சுவ செரியா ஆம்புலன்ஸ்"
-            }
-        }
-        
-        return responses.get(emergency_type, {}).get(language, responses.get(emergency_type, {}).get('en', ''))
+        return (RESPONSE_TEXT_BY_LANGUAGE.get((emergency_type, language))
+                or RESPONSE_TEXT_BY_LANGUAGE.get((emergency_type, 'en'), ''))
 
 
 # Singleton instance
@@ -0,0 +1,152 @@
+"""
+Test script for Twilio status callbacks waking the Reflection Agent
+Checks that record_call_status wakes a monitor waiting on a call, that
+the router and the Escalation Agent share one status registry, and that
+the webhook accepts Twilio-signed callbacks carrying empty parameters
+"""
+import sys
+import os
+import asyncio
+import importlib
+import threading
+import time
+from urllib.parse import urlencode
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.reflection_agent import reflection_agent, record_call_status, _watch_call, _unwatch_call
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def test_callback_wakes_waiting_monitor():
+    """Test 1: A pushed status ends the wait long before the timeout"""
+    print("\n" + "="*70)
+    print("TEST 1: Status Callback Wakes Monitor")
+    print("="*70)
+
+    call_sid = "CA_test_wakeup"
+    timeout = 10
+
+    async def wait_for_push():
+        _watch_call(call_sid)
+        try:
+            # Deliver the callback from another thread, like the webhook handler
+            threading.Timer(0.2, record_call_status, args=(call_sid, "in-progress")).start()
+            start = time.monotonic()
+            await reflection_agent._wait_for_status_change(call_sid, "ringing", timeout)
+            return time.monotonic() - start
+        finally:
+            _unwatch_call(call_sid)
+
+    elapsed = asyncio.run(wait_for_push())
+    print(f"   Woke after {elapsed:.2f}s (timeout {timeout}s)")
+    assert elapsed < 2, f"Monitor was not woken by the callback ({elapsed:.2f}s)"
+    print("✅ Callback woke the monitor")
+
+
+def test_unmonitored_call_is_ignored():
+    """Test 2: Callbacks for calls nobody monitors are rejected"""
+    print("\n" + "="*70)
+    print("TEST 2: Unmonitored Call Callback")
+    print("="*70)
+
+    assert record_call_status("CA_not_monitored", "completed") is False
+    print("✅ Callback for an unmonitored call returned False")
+
+
+def test_shared_status_registry():
+    """Test 3: App modules import each other relatively, so the router sees one registry"""
+    print("\n" + "="*70)
+    print("TEST 3: Shared Status Registry")
+    print("="*70)
+
+    # The router loads the app as AI_backend.app; an absolute "app." import inside
+    # the package would load a second copy with its own status registry
+    app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app")
+    for filename in sorted(os.listdir(app_dir)):
+        if not filename.endswith(".py"):
+            continue
+        with open(os.path.join(app_dir, filename), encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                stripped = line.strip()
+                assert not stripped.startswith(("from app.", "import app.")), \
+                    f"{filename}:{line_number} uses an absolute app import: {stripped}"
+
+    escalation_module = importlib.import_module("AI_backend.app.escalation_agent")
+    reflection_module = importlib.import_module(".reflection_agent", escalation_module.__package__)
+    assert reflection_module is sys.modules["AI_backend.app.reflection_agent"]
+    print(f"✅ {escalation_module.__name__} and the router share {reflection_module.__name__}")
+
+
+def test_signed_callback_with_empty_parameters():
+    """Test 4: The webhook validates signatures over empty parameters too"""
+    print("\n" + "="*70)
+    print("TEST 4: Signed Callback With Empty Parameters")
+    print("="*70)
+
+    import httpx
+    from fastapi import FastAPI
+    from twilio.request_validator import RequestValidator
+    import AI_backend.app.chat_router as chat_router
+    import AI_backend.app.reflection_agent as shared_reflection
+
+    auth_token = "test-auth-token"
+    callback_url = "https://example.ngrok.app/call_status_callback"
+    call_sid = "CA_test_signed"
+    # Sri Lankan numbers usually arrive without caller city/zip details
+    params = {
+        "CallSid": call_sid,
+        "CallStatus": "in-progress",
+        "CallerCity": "",
+        "CallerZip": "",
+        "ForwardedFrom": ""
+    }
+    signature = RequestValidator(auth_token).compute_signature(callback_url, params)
+
+    app = FastAPI()
+    app.include_router(chat_router.router)
+    original = chat_router.TWILIO_AUTH_TOKEN, chat_router.STATUS_CALLBACK_URL
+    chat_router.TWILIO_AUTH_TOKEN, chat_router.STATUS_CALLBACK_URL = auth_token, callback_url
+
+    async def post(signature):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.post(
+                "/call_status_callback",
+                content=urlencode(params),
+                headers={
+                    "Content-Type": "application/x-www-form-urlencoded",
+                    "X-Twilio-Signature": signature
+                }
+            )
+
+    async def deliver():
+        shared_reflection._watch_call(call_sid)
+        try:
+            accepted = await post(signature)
+            recorded = shared_reflection._status_cache.get(call_sid)
+            rejected = await post("forged-signature")
+            return accepted, recorded, rejected
+        finally:
+            shared_reflection._unwatch_call(call_sid)
+
+    try:
+        accepted, recorded, rejected = asyncio.run(deliver())
+    finally:
+        chat_router.TWILIO_AUTH_TOKEN, chat_router.STATUS_CALLBACK_URL = original
+
+    assert accepted.status_code == 200, f"Valid callback rejected: {accepted.status_code}"
+    assert recorded == "in-progress", f"Status not recorded: {recorded}"
+    assert rejected.status_code == 403, f"Forged callback accepted: {rejected.status_code}"
+    print("✅ Signed callback with empty parameters accepted, forged one rejected")
+
+
+if __name__ == "__main__":
+    test_callback_wakes_waiting_monitor()
+    test_unmonitored_call_is_ignored()
+    test_shared_status_registry()
+    test_signed_callback_with_empty_parameters()
+    print("\n✅ All status callback tests passed")
@@ -0,0 +1,139 @@
+"""
+Test script for conversation checkpointing
+Checks that create_checkpointer picks the backend from CHECKPOINT_BACKEND,
+builds the async savers inside the event loop, and falls back to the
+bounded in-memory saver when a backend is unavailable; and that the
+in-memory saver compresses checkpoints and evicts the oldest threads
+"""
+import sys
+import os
+import asyncio
+import importlib.util
+import tempfile
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.checkpoint_utils import BoundedMemorySaver, CompressedSerializer
+from app.langgraph_enhanced import create_checkpointer
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def make_checkpointer(backend, **env):
+    """Build a checkpointer inside a running loop with the given environment"""
+    saved = {key: os.environ.get(key) for key in ["CHECKPOINT_BACKEND", *env]}
+    os.environ["CHECKPOINT_BACKEND"] = backend
+    os.environ.update(env)
+
+    async def build():
+        return create_checkpointer()
+
+    try:
+        return asyncio.run(build())
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def test_memory_backend():
+    """Test 1: memory and unknown backends use the bounded in-memory saver"""
+    print("\n" + "="*70)
+    print("TEST 1: Memory Backend")
+    print("="*70)
+
+    for backend in ["memory", "MEMORY", "unknown"]:
+        saver = make_checkpointer(backend, CHECKPOINT_MAX_THREADS="5")
+        assert isinstance(saver, BoundedMemorySaver), f"{backend}: got {type(saver).__name__}"
+        assert saver.max_threads == 5
+        print(f"✅ CHECKPOINT_BACKEND={backend} -> {type(saver).__name__}")
+
+
+def test_sqlite_backend():
+    """Test 2: sqlite uses AsyncSqliteSaver, or falls back when the package is missing"""
+    print("\n" + "="*70)
+    print("TEST 2: SQLite Backend")
+    print("="*70)
+
+    installed = (importlib.util.find_spec("aiosqlite") is not None
+                 and importlib.util.find_spec("langgraph.checkpoint.sqlite") is not None)
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = make_checkpointer("sqlite", CHECKPOINT_DB=os.path.join(tmp, "checkpoints.db"))
+
+    if installed:
+        assert type(saver).__name__ == "AsyncSqliteSaver", f"got {type(saver).__name__}"
+    else:
+        assert isinstance(saver, BoundedMemorySaver), f"got {type(saver).__name__}"
+    print(f"✅ CHECKPOINT_BACKEND=sqlite -> {type(saver).__name__} (package installed: {installed})")
+
+
+def test_redis_backend():
+    """Test 3: redis uses AsyncRedisSaver, or falls back when the package is missing"""
+    print("\n" + "="*70)
+    print("TEST 3: Redis Backend")
+    print("="*70)
+
+    installed = importlib.util.find_spec("langgraph.checkpoint.redis") is not None
+    saver = make_checkpointer("redis")
+
+    if installed:
+        assert type(saver).__name__ == "AsyncRedisSaver", f"got {type(saver).__name__}"
+    else:
+        assert isinstance(saver, BoundedMemorySaver), f"got {type(saver).__name__}"
+    print(f"✅ CHECKPOINT_BACKEND=redis -> {type(saver).__name__} (package installed: {installed})")
+
+
+def test_eviction_bound():
+    """Test 4: the in-memory saver never holds more than max_threads threads"""
+    print("\n" + "="*70)
+    print("TEST 4: BoundedMemorySaver Eviction")
+    print("="*70)
+
+    max_threads = 3
+    saver = BoundedMemorySaver(max_threads=max_threads)
+    thread_ids = [f"thread-{i}" for i in range(max_threads + 2)]
+
+    def config(thread_id):
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+    for thread_id in thread_ids:
+        saver.put(config(thread_id), empty_checkpoint(), {}, {})
+    # Writing to the oldest surviving thread makes it the most recent
+    saver.put(config(thread_ids[2]), empty_checkpoint(), {}, {})
+    saver.put(config("thread-new"), empty_checkpoint(), {}, {})
+
+    kept = [t for t in thread_ids + ["thread-new"] if saver.get_tuple(config(t)) is not None]
+    assert len(kept) == max_threads, f"kept {kept}"
+    assert kept == ["thread-2", "thread-4", "thread-new"], f"kept {kept}"
+    print(f"✅ Kept {kept} (max_threads={max_threads})")
+
+
+def test_compressed_serializer():
+    """Test 5: checkpoints round-trip through the zlib serializer"""
+    print("\n" + "="*70)
+    print("TEST 5: CompressedSerializer Round Trip")
+    print("="*70)
+
+    serde = CompressedSerializer()
+    state = {"messages": ["Call 119 for police " * 50], "summarized_count": 4}
+    type_, payload = serde.dumps_typed(state)
+    assert type_.startswith("zlib+"), type_
+    assert serde.loads_typed((type_, payload)) == state
+    uncompressed = serde.loads_typed(JsonPlusSerializer().dumps_typed(state))
+    assert uncompressed == state, "Uncompressed checkpoints must still load"
+    print(f"✅ Round trip OK ({type_}, {len(payload)} bytes)")
+
+
+if __name__ == "__main__":
+    test_memory_backend()
+    test_sqlite_backend()
+    test_redis_backend()
+    test_eviction_bound()
+    test_compressed_serializer()
+    print("\n✅ All checkpointing tests passed")
@@ -99,7 +99,7 @@ def test_parallel_execution():
     print("   Run manually if you want to test full pipeline.")
     
     # Note: Actual LLM test would be:
-    # response_data = get_enhanced_response("how to stay safe during fire?")
+    # response_data = asyncio.run(get_enhanced_response("how to stay safe during fire?"))
     # But we skip it to avoid API costs in automated tests
     
     print(f"\n📊 PARALLEL EXECUTION INFO:")
@@ -4,6 +4,7 @@ Tests autonomous monitoring, failure analysis, and retry logic
 """
 import sys
 import os
+import asyncio
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -76,21 +77,24 @@ def test_llm_failure_analysis():
     
     agent = ReflectionRecoveryAgent()
     
-    # Test scenario: First attempt "no-answer"
-    print("\n🧪 Test Scenario: First attempt 'no-answer' on Police Emergency")
+    # Test scenario: Second attempt "no-answer" (RECOVERY_RULES only covers the
+    # first attempt, so this situation is decided by the LLM)
+    print("\n🧪 Test Scenario: Second attempt 'no-answer' on Police Emergency")
     
     current_contact = agent.EMERGENCY_CONTACTS["police"][0]
     remaining_contacts = agent.EMERGENCY_CONTACTS["police"][1:]
+    assert agent._decide_by_rules("no-answer", 2, remaining_contacts) is None, \
+        "Scenario is covered by RECOVERY_RULES; pick one that reaches the LLM"
     
     try:
-        decision = agent._analyze_failure_and_decide(
+        decision = asyncio.run(agent._analyze_failure_and_decide(
             call_status="no-answer",
             emergency_type="police",
-            attempt=1,
+            attempt=2,
             current_contact=current_contact,
             remaining_contacts=remaining_contacts,
             user_message="Someone is breaking into my house!"
-        )
+        ))
         
         print("\n🧠 LLM Decision:")
         print(f"   Should Retry: {decision.get('should_retry', 'N/A')}")
@@ -99,9 +103,9 @@ def test_llm_failure_analysis():
         print(f"   Reasoning: {decision.get('reasoning', 'N/A')}")
         
         if decision.get('should_retry'):
-            print("\n✅ PASS: Agent decided to retry (expected for first attempt)")
+            print("\n✅ PASS: Agent decided to retry (expected with backup contacts left)")
         else:
-            print("\n⚠️  UNEXPECTED: Agent decided NOT to retry on first attempt")
+            print("\n⚠️  UNEXPECTED: Agent decided NOT to retry with backup contacts left")
             
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
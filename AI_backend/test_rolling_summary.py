@@ -0,0 +1,136 @@
+"""
+Test script for the rolling conversation summary
+Checks that summarized_count only advances when the summary call succeeds,
+and that the summary and the verbatim window sent to the model never overlap
+"""
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.langgraph_enhanced as enhanced
+from langchain_core.messages import HumanMessage, AIMessage
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CRITICAL_MESSAGE = "my father is unconscious and not breathing"
+MODERATE_MESSAGE = "someone broke into my house"
+
+
+class FakeGraph:
+    """Stands in for the compiled graph; returns a fixed checkpointed state"""
+
+    def __init__(self, values):
+        self.values = values
+
+    async def aget_state(self, config):
+        return SimpleNamespace(values=self.values)
+
+
+def make_thread(turns):
+    """Checkpointed thread of alternating user/assistant messages"""
+    return [
+        HumanMessage(content=f"user turn {i}") if i % 2 == 0 else AIMessage(content=f"assistant turn {i}")
+        for i in range(turns)
+    ]
+
+
+def build_input(saved_state, user_message, summary_result):
+    """Run build_graph_input against a saved state with a stubbed summary call"""
+    calls = []
+
+    async def fake_graph():
+        return FakeGraph(saved_state)
+
+    async def fake_summary(previous_summary, older_messages):
+        calls.append(older_messages)
+        return summary_result
+
+    original = enhanced.aget_enhanced_graph, enhanced.update_rolling_summary
+    enhanced.aget_enhanced_graph, enhanced.update_rolling_summary = fake_graph, fake_summary
+    try:
+        config = {"configurable": {"thread_id": "summary-test"}}
+        return asyncio.run(enhanced.build_graph_input(user_message, config)), calls
+    finally:
+        enhanced.aget_enhanced_graph, enhanced.update_rolling_summary = original
+
+
+def test_failed_summary_keeps_count():
+    """Test 1: A failed summary call leaves the summary and its count untouched"""
+    print("\n" + "="*70)
+    print("TEST 1: Failed Summary Does Not Advance")
+    print("="*70)
+
+    history = make_thread(enhanced.MAX_HISTORY + enhanced.SUMMARY_EVERY)
+    saved = {"messages": history, "rolling_summary": "old summary", "summarized_count": 0}
+    graph_input, calls = build_input(saved, MODERATE_MESSAGE, None)
+
+    assert len(calls) == 1, "Summary should have been attempted"
+    assert graph_input["rolling_summary"] == "old summary"
+    assert graph_input["summarized_count"] == 0
+    print("✅ summarized_count stayed at 0 after the failed call")
+
+
+def test_successful_summary_advances_count():
+    """Test 2: A successful summary covers everything older than the window"""
+    print("\n" + "="*70)
+    print("TEST 2: Successful Summary Advances")
+    print("="*70)
+
+    history = make_thread(enhanced.MAX_HISTORY + enhanced.SUMMARY_EVERY)
+    saved = {"messages": history, "rolling_summary": "", "summarized_count": 0}
+    graph_input, calls = build_input(saved, MODERATE_MESSAGE, "new summary")
+
+    assert graph_input["rolling_summary"] == "new summary"
+    assert graph_input["summarized_count"] == enhanced.SUMMARY_EVERY
+    assert calls[0] == history[:enhanced.SUMMARY_EVERY]
+    print(f"✅ summarized_count advanced to {graph_input['summarized_count']}")
+
+
+def test_critical_window_not_summarized():
+    """Test 3: Critical turns summarize only what falls outside the wider window"""
+    print("\n" + "="*70)
+    print("TEST 3: Critical Window Is Not Summarized")
+    print("="*70)
+
+    history = make_thread(enhanced.CRITICAL_HISTORY)
+    saved = {"messages": history, "rolling_summary": "", "summarized_count": 0}
+    graph_input, calls = build_input(saved, CRITICAL_MESSAGE, "new summary")
+
+    # The whole thread fits in the critical window, so nothing needs summarizing
+    assert calls == [], f"Summarized {len(calls[0])} messages that are sent verbatim"
+    assert graph_input["summarized_count"] == 0
+    print(f"✅ {len(history)} messages sent verbatim, none summarized")
+
+
+def test_model_messages_skip_summarized_turns():
+    """Test 4: Messages covered by the summary are not repeated verbatim"""
+    print("\n" + "="*70)
+    print("TEST 4: No Overlap Between Summary and Window")
+    print("="*70)
+
+    history = make_thread(enhanced.CRITICAL_HISTORY)
+    summarized_count = len(history) - enhanced.MAX_HISTORY
+    state = {
+        "messages": [*history, HumanMessage(content=CRITICAL_MESSAGE)],
+        "rolling_summary": "summary of earlier turns",
+        "summarized_count": summarized_count
+    }
+    model_messages = enhanced.build_model_messages(state, "en")
+    verbatim = model_messages[2:]
+
+    assert verbatim == state["messages"][summarized_count:], "Summarized turns were resent"
+    assert verbatim[-1].content == CRITICAL_MESSAGE
+    print(f"✅ Sent summary + {len(verbatim)} messages (skipped {summarized_count} summarized)")
+
+
+if __name__ == "__main__":
+    test_failed_summary_keeps_count()
+    test_successful_summary_advances_count()
+    test_critical_window_not_summarized()
+    test_model_messages_skip_summarized_turns()
+    print("\n✅ All rolling summary tests passed")